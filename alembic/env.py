@@ -1,6 +1,6 @@
 import asyncio
 from logging.config import fileConfig
-from sqlalchemy import pool
+from sqlalchemy import pool, text
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import create_async_engine
 from alembic import context
@@ -16,22 +16,44 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# `alembic -x shard=<name> upgrade head` migrates one of settings.DATABASE_SHARDS;
+# python -m app.db.migrate_shards runs it for all of them
+shard = context.get_x_argument(as_dictionary=True).get("shard", "default")
+url = config.get_main_option("sqlalchemy.url")
+schema = None
+if shard != "default":
+    from app.core.config import settings
+
+    spec = settings.DATABASE_SHARDS[shard]
+    url = spec.get("url", settings.DATABASE_URL)
+    schema = spec.get("schema")
+
 def run_migrations_offline():
     context.configure(
-        url=config.get_main_option("sqlalchemy.url"),
+        url=url,
         target_metadata=target_metadata,
+        version_table_schema=schema,
         literal_binds=True,
         compare_type=True,
         compare_server_default=True,
         dialect_opts={"paramstyle": "named"},
     )
     with context.begin_transaction():
+        if schema:
+            context.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            context.execute(f'SET search_path TO "{schema}", public')
         context.run_migrations()
 
 def do_run_migrations(connection: Connection):
+    if schema:
+        # unqualified table names in the migrations land in the shard's schema
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        connection.execute(text(f'SET search_path TO "{schema}", public'))
+        connection.commit()
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
+        version_table_schema=schema,
         compare_type=True,
         compare_server_default=True,
         render_as_batch=True,  # important for SQLite / ALTER TABLE
@@ -41,7 +63,7 @@ def do_run_migrations(connection: Connection):
 
 async def run_migrations_online():
     connectable = create_async_engine(
-        config.get_main_option("sqlalchemy.url"),
+        url,
         poolclass=pool.NullPool,
     )
 
@@ -0,0 +1,45 @@
+"""refresh token family and active index
+
+Revision ID: 0f6b2d84e9c1
+Revises: e3a91c7f0d58
+Create Date: 2026-10-18 13:41:08.662930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f6b2d84e9c1'
+down_revision: Union[str, Sequence[str], None] = 'e3a91c7f0d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('family_id', sa.UUID(), nullable=True))
+
+    # every existing token starts its own family
+    op.execute("UPDATE refresh_tokens SET family_id = refresh_token_id")
+
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.alter_column('family_id', nullable=False)
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_family_id'), ['family_id'], unique=False)
+        batch_op.create_index(
+            'ix_refresh_tokens_user_id_active',
+            ['user_id'],
+            unique=False,
+            postgresql_where=sa.text('revoked = false'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_refresh_tokens_user_id_active')
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_family_id'))
+        batch_op.drop_column('family_id')
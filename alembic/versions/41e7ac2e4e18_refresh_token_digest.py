@@ -0,0 +1,42 @@
+"""refresh token digest
+
+Revision ID: 41e7ac2e4e18
+Revises: d86913c899fe
+Create Date: 2026-10-18 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41e7ac2e4e18'
+down_revision: Union[str, Sequence[str], None] = 'd86913c899fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows hold salted argon2 hashes that can never be matched again,
+    # so those sessions are dropped and users simply log in once more.
+    op.execute("DELETE FROM refresh_tokens")
+
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_token'))
+        batch_op.drop_column('token')
+        batch_op.add_column(sa.Column('token_digest', sa.String(length=64), nullable=False))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_token_digest'), ['token_digest'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM refresh_tokens")
+
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_token_digest'))
+        batch_op.drop_column('token_digest')
+        batch_op.add_column(sa.Column('token', sa.String(), nullable=False))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_token'), ['token'], unique=False)
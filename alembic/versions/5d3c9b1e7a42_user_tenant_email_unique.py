@@ -0,0 +1,32 @@
+"""unique user email per tenant
+
+Revision ID: 5d3c9b1e7a42
+Revises: c8d17f3a5e90
+Create Date: 2026-10-18 17:05:21.463118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3c9b1e7a42'
+down_revision: Union[str, Sequence[str], None] = 'c8d17f3a5e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Registration never let a tenant hold the same email twice, but it only
+    # checked with a SELECT first; fails loudly if a race ever slipped one in.
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_tenant_id_email', ['tenant_id', 'email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_tenant_id_email')
@@ -0,0 +1,34 @@
+"""user token epoch
+
+Revision ID: 7c2d9e5b31a4
+Revises: 41e7ac2e4e18
+Create Date: 2026-10-18 10:02:17.554091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d9e5b31a4'
+down_revision: Union[str, Sequence[str], None] = '41e7ac2e4e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('token_epoch_changed_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_index(batch_op.f('ix_users_token_epoch_changed_at'), ['token_epoch_changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_token_epoch_changed_at'))
+        batch_op.drop_column('token_epoch_changed_at')
+        batch_op.drop_column('token_epoch')
@@ -0,0 +1,123 @@
+"""partition refresh_tokens by expires_at (optional)
+
+Opt-in: only does anything when run with
+    alembic -x partition_refresh_tokens=true upgrade head
+or, for every shard,
+    python -m app.db.migrate_shards -x partition_refresh_tokens=true
+Otherwise it is a no-op, so plain `alembic upgrade head` keeps the regular table.
+
+Revision ID: 9a4e6c1b7f23
+Revises: 0f6b2d84e9c1
+Create Date: 2026-10-18 14:30:55.019847
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6c1b7f23'
+down_revision: Union[str, Sequence[str], None] = '0f6b2d84e9c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _enabled() -> bool:
+    return context.get_x_argument(as_dictionary=True).get('partition_refresh_tokens', '').lower() in ('1', 'true', 'yes')
+
+
+def _create_indexes() -> None:
+    # unique constraints on a partitioned table must include the partition key
+    op.execute("CREATE UNIQUE INDEX ix_refresh_tokens_token_digest ON refresh_tokens (token_digest, expires_at)")
+    op.execute("CREATE INDEX ix_refresh_tokens_refresh_token_id ON refresh_tokens (refresh_token_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_tenant_id ON refresh_tokens (tenant_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_family_id ON refresh_tokens (family_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_user_id_active ON refresh_tokens (user_id) WHERE revoked = false")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _enabled():
+        return
+
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_old")
+    op.execute("ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_old_pkey")
+    op.execute("""
+        CREATE TABLE refresh_tokens (
+            refresh_token_id UUID NOT NULL,
+            token_digest VARCHAR(64) NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            family_id UUID NOT NULL,
+            tenant_id UUID NOT NULL REFERENCES tenants (tenant_id),
+            revoked BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (refresh_token_id, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+    """)
+    op.execute("CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT")
+
+    # one partition per month from the current month; the token reaper keeps
+    # creating them ahead of time and drops them once they are fully expired
+    from app.core.config import settings
+    months_ahead = int(settings.TOKEN_PARTITION_MONTHS_AHEAD)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            m date;
+        BEGIN
+            FOR m IN SELECT generate_series(date_trunc('month', now()), date_trunc('month', now()) + interval '{months_ahead} months', interval '1 month')::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF refresh_tokens FOR VALUES FROM (%L) TO (%L)',
+                    'refresh_tokens_p' || to_char(m, 'YYYYMM'), m, (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        INSERT INTO refresh_tokens (refresh_token_id, token_digest, user_id, family_id, tenant_id, revoked, created_at, expires_at)
+        SELECT refresh_token_id, token_digest, user_id, family_id, tenant_id, revoked, created_at, expires_at
+        FROM refresh_tokens_old
+        WHERE expires_at >= date_trunc('month', now())
+    """)
+    op.execute("DROP TABLE refresh_tokens_old")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    partitioned = bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'refresh_tokens'::regclass)"
+    )).scalar()
+    if not partitioned:
+        return
+
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned")
+    op.execute("ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_partitioned_pkey")
+    for index in ('ix_refresh_tokens_token_digest', 'ix_refresh_tokens_refresh_token_id', 'ix_refresh_tokens_tenant_id',
+                  'ix_refresh_tokens_family_id', 'ix_refresh_tokens_user_id_active'):
+        op.execute(f"DROP INDEX {index}")
+    op.execute("""
+        CREATE TABLE refresh_tokens (
+            refresh_token_id UUID PRIMARY KEY,
+            token_digest VARCHAR(64) NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            family_id UUID NOT NULL,
+            tenant_id UUID NOT NULL REFERENCES tenants (tenant_id),
+            revoked BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+    """)
+    op.execute("INSERT INTO refresh_tokens SELECT refresh_token_id, token_digest, user_id, family_id, tenant_id, revoked, created_at, expires_at FROM refresh_tokens_partitioned")
+    op.execute("DROP TABLE refresh_tokens_partitioned")
+    op.execute("CREATE UNIQUE INDEX ix_refresh_tokens_token_digest ON refresh_tokens (token_digest)")
+    op.execute("CREATE INDEX ix_refresh_tokens_refresh_token_id ON refresh_tokens (refresh_token_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_tenant_id ON refresh_tokens (tenant_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_family_id ON refresh_tokens (family_id)")
+    op.execute("CREATE INDEX ix_refresh_tokens_user_id_active ON refresh_tokens (user_id) WHERE revoked = false")
@@ -0,0 +1,36 @@
+"""keyset pagination indexes
+
+Revision ID: b5f0a8d4c6e2
+Revises: 7c2d9e5b31a4
+Create Date: 2026-10-18 11:20:43.908716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f0a8d4c6e2'
+down_revision: Union[str, Sequence[str], None] = '7c2d9e5b31a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_tenant_id_created_at_user_id', ['tenant_id', 'created_at', 'user_id'], unique=False)
+
+    with op.batch_alter_table('tenants', schema=None) as batch_op:
+        batch_op.create_index('ix_tenants_created_at_tenant_id', ['created_at', 'tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tenants', schema=None) as batch_op:
+        batch_op.drop_index('ix_tenants_created_at_tenant_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_tenant_id_created_at_user_id')
@@ -0,0 +1,32 @@
+"""user updated_at
+
+Revision ID: c8d17f3a5e90
+Revises: 9a4e6c1b7f23
+Create Date: 2026-10-18 15:48:12.730561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d17f3a5e90'
+down_revision: Union[str, Sequence[str], None] = '9a4e6c1b7f23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+        batch_op.create_index('ix_users_tenant_id_updated_at_user_id', ['tenant_id', 'updated_at', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_tenant_id_updated_at_user_id')
+        batch_op.drop_column('updated_at')
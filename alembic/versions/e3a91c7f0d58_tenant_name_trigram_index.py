@@ -0,0 +1,32 @@
+"""tenant name trigram index
+
+Revision ID: e3a91c7f0d58
+Revises: b5f0a8d4c6e2
+Create Date: 2026-10-18 12:05:31.274410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a91c7f0d58'
+down_revision: Union[str, Sequence[str], None] = 'b5f0a8d4c6e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_tenants_name_trgm ON tenants USING gin (name gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_tenants_name_lower_pattern ON tenants (lower(name) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_tenants_name_lower_pattern")
+    op.execute("DROP INDEX IF EXISTS ix_tenants_name_trgm")
+    # pg_trgm is left installed; other objects may depend on it
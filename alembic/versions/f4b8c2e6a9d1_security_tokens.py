@@ -0,0 +1,48 @@
+"""security_tokens table
+
+The model existed without a migration, so deleting a user failed on the
+ORM cascade. Rows go with their user (ON DELETE CASCADE).
+
+Revision ID: f4b8c2e6a9d1
+Revises: a2f4c6e8b013
+Create Date: 2026-10-18 21:05:13.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8c2e6a9d1'
+down_revision: Union[str, Sequence[str], None] = 'a2f4c6e8b013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('security_tokens',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('token_hash', sa.String(), nullable=False),
+    sa.Column('token_type', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('used_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.tenant_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('security_tokens', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_security_tokens_tenant_id'), ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('security_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_security_tokens_tenant_id'))
+
+    op.drop_table('security_tokens')
@@ -1,43 +1,121 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.session import AsyncSessionLocal
-from jose import jwt, JWTError
+from app.core.principal_cache import Principal, principal_cache
+from app.core.jwt_manager import decode_access_token
+from app.core.token_epochs import token_epochs
+from app.db.session import AsyncSessionLocal, AsyncReadSessionLocal
+from app.db.replica import replica_health
+from app.db.shards import shard_router
+from sqlalchemy.exc import DBAPIError
+from jose import JWTError
+from uuid import UUID
 from typing import AsyncGenerator
-from app.models.user import User
-from sqlalchemy import select
+from contextlib import asynccontextmanager
+from app.repositories.user_repo import UserRepository
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Default shard: the tenant directory and unsharded tenants."""
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(token: str, db: AsyncSession = Depends(get_db)) -> User:
+@asynccontextmanager
+async def read_session(tenant_id=None):
     """
-    Validate access token and ensure user exists.
-    Access tokens are stateless, so we only verify JWT signature and expiration.
+    Session for read-only work on the tenant's shard: on the default shard the
+    replica while it is reachable and within READ_REPLICA_MAX_LAG_SEC,
+    otherwise the primary. Never write through it.
     """
+    factory = await shard_router.read_sessionmaker_for(tenant_id)
+    async with factory() as session:
+        try:
+            yield session
+        except (OSError, DBAPIError):
+            if factory is AsyncReadSessionLocal:
+                replica_health.mark_down()
+            raise
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session() as session:
+        yield session
+
+def decode_token(token: str) -> dict:
+    """Verified access token payload with a UUID `sub`; 401 otherwise."""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        payload = decode_access_token(token)
+        UUID(payload.get("sub") or "")
+    except (JWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+async def load_principals(db: AsyncSession, user_ids) -> dict[str, Principal]:
+    """
+    Principals by user_id string from the principal cache, with one query for
+    every miss. Unknown users are left out. `db` must be on a primary, since
+    misses fill the cache.
+    """
+    found, missing = {}, []
+    for user_id in {str(u) for u in user_ids}:
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            missing.append(UUID(user_id))
+        else:
+            found[user_id] = principal
+
+    if missing:
+        for user in await UserRepository.get_many(db, missing):
+            principal = Principal.from_user(user)
+            principal_cache.set(principal)
+            found[str(user.user_id)] = principal
+    return found
+
+async def get_current_user(token: str) -> Principal:
+    """
+    Validate access token and ensure user exists.
+    Access tokens are stateless, so we only verify JWT signature and expiration.
+    The user lookup is served from the principal cache when possible; in
+    AUTH_CLAIMS_MODE the token claims are trusted and only the epoch is checked.
+    Lookups go to the primary of the token's `tid` shard: what they load is
+    cached, and a lagging replica would cache a deactivated or demoted user.
+    """
+    payload = decode_token(token)
+
+    async with shard_router.sessionmaker_for(payload.get("tid"))() as db:
+        if settings.AUTH_CLAIMS_MODE:
+            return await principal_from_claims(payload, db)
+        principal = (await load_principals(db, [payload["sub"]])).get(payload["sub"])
 
-    # Verify user exists
-    stmt = select(User).where(User.user_id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-    if not user:
+    if principal is None:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user  # No DB check for access token revocation — handled by refresh token lifecycle
+    if not principal.is_active:
+        raise HTTPException(status_code=401, detail="Inactive user")
+
+    return principal  # No DB check for access token revocation — handled by refresh token lifecycle
+
+async def principal_from_claims(payload: dict, db: AsyncSession) -> Principal:
+    """`db` must be a session on the shard of payload["tid"]."""
+    await token_epochs.maybe_refresh(db, shard_router.shard_for(payload.get("tid")))
+
+    epoch = payload.get("ep")
+    if epoch is None or "tid" not in payload or "role" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if epoch < token_epochs.current(payload["sub"]):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
+    return Principal(
+        user_id=UUID(payload["sub"]),
+        tenant_id=UUID(payload["tid"]),
+        email=payload.get("email"),
+        role=payload["role"],
+        is_active=True,  # deactivation bumps the epoch
+    )
 
 def require_role(*roles):
     """
     FastAPI dependency to enforce user roles.
     """
-    async def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -45,3 +123,12 @@ def require_role(*roles):
             )
         return current_user
     return role_checker
+
+async def get_tenant_db(current_user: Principal = Depends(get_current_user)) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the shard holding the caller's tenant."""
+    async with shard_router.sessionmaker_for(current_user.tenant_id)() as session:
+        yield session
+
+async def get_tenant_read_db(current_user: Principal = Depends(get_current_user)) -> AsyncGenerator[AsyncSession, None]:
+    async with read_session(current_user.tenant_id) as session:
+        yield session
@@ -1,25 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Body, status, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.api.deps import get_db, get_current_user, require_role
+from app.api.deps import get_current_user, decode_token, load_principals, principal_from_claims, require_role
+from app.core.principal_cache import Principal
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
-from app.core.security import hash_password, create_access_token, create_refresh_token, verify_password
+from app.core.security import token_digest
+from app.core.jwt_manager import create_access_token, create_refresh_token, refresh_token_tenant, user_claims
+from app.core.token_epochs import bump_epoch, token_epochs
+from app.core.events import TOKENS_REVOKED, event_bus
+from app.core.hashing import hash_password
+from app.core.rate_limit import client_ip, rate_limiter
 from app.core.config import settings
+from app.core.sql_profiler import sql_budget
 from datetime import datetime, timedelta, timezone
-from app.schemas.auth import Login
+from app.schemas.auth import CurrentUser, IntrospectRequest, Login
 from app.services.auth_service import AuthService
+from app.services.audit_log import LOGOUT, TOKEN_REFRESHED, audit_log
+from app.repositories.token_repo import TokenRepository
+from app.repositories.user_repo import UserRepository
+from app.db.shards import shard_router
+from jose import JWTError
+from collections import defaultdict
+import hmac
 import uuid
 
-router = APIRouter()
+router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login")
-async def login(payload: Login, response: Response, db: AsyncSession = Depends(get_db)):
-    access_token, refresh_token, user = await AuthService.login(
-        db=db,
-        email=payload.email,
-        password=payload.password
-    )
+@sql_budget(3)  # user, refresh token, argon2 re-hash
+async def login(payload: Login, request: Request, response: Response):
+    # cheap 429s before any query or hash: the default limits, or the given
+    # tenant's; AuthService.login applies the user's tenant limits again
+    ip = client_ip(request)
+    email = payload.email.lower()
+    await rate_limiter.check("login_ip", ip, rate_limiter.limit("login_ip", payload.tenant_id))
+    await rate_limiter.check("login_email", email, rate_limiter.limit("login_email", payload.tenant_id))
+
+    async with shard_router.sessionmaker_for(payload.tenant_id)() as db:
+        access_token, refresh_token, user = await AuthService.login(
+            db=db,
+            email=payload.email,
+            password=payload.password,
+            client_ip=ip,
+            tenant_id=payload.tenant_id,
+        )
 
     # Store refresh token in a HttpOnly cookie
     response.set_cookie(
@@ -43,37 +67,23 @@ async def login(payload: Login, response: Response, db: AsyncSession = Depends(g
 
 
 @router.post("/register")
+@sql_budget(1)
 async def register(
+    request: Request,
     email: str = Body(...),
     password: str = Body(...),
     tenant_id: str = Body(...),
-    db: AsyncSession = Depends(get_db)
 ):
     # ensure UUID format
     tenant_id = uuid.UUID(tenant_id)
+    await rate_limiter.check("register_ip", client_ip(request), rate_limiter.limit("register_ip", tenant_id))
 
-    stmt = select(User).where(
-        User.email == email,
-        User.tenant_id == tenant_id
-    )
-    result = await db.execute(stmt)
-    existing_user = result.scalar_one_or_none()
-    if existing_user:
+    hashed_pw = await hash_password(password)
+    async with shard_router.sessionmaker_for(tenant_id)() as db:
+        user = await UserRepository.create(db, email, hashed_pw, tenant_id)
+    if user is None:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed_pw = hash_password(password)
-    user = User(
-        user_id=uuid.uuid4(),
-        email=email,
-        hashed_password=hashed_pw,
-        tenant_id=tenant_id,
-        role="user"
-    )
-
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-
     return {
         "user_id": str(user.user_id),
         "email": user.email,
@@ -86,30 +96,46 @@ async def register(
 # REFRESH TOKEN
 # -------------------------
 @router.post("/refresh")
-async def refresh_token(refresh_token: str = Body(...), db: AsyncSession = Depends(get_db)):
-    stmt = select(RefreshToken).where(RefreshToken.token == refresh_token)
-    result = await db.execute(stmt)
-    token_obj = result.scalar_one_or_none()
-
-    if not token_obj or token_obj.revoked or token_obj.expires_at < datetime.now(timezone.utc):
+@sql_budget(3)
+async def refresh_token(request: Request, refresh_token: str = Body(...)):
+    try:
+        tenant_id = refresh_token_tenant(refresh_token)
+    except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    # Revoke old token
-    token_obj.revoked = True
+    async with shard_router.sessionmaker_for(tenant_id)() as db:
+        return await _rotate_refresh_token(db, refresh_token, client_ip(request))
 
-    new_refresh = create_refresh_token(str(token_obj.user_id))
-    new_access = create_access_token(str(token_obj.user_id))
+async def _rotate_refresh_token(db: AsyncSession, refresh_token: str, ip: str) -> dict:
+    digest = token_digest(refresh_token)
+    rotated = await TokenRepository.rotate(db, digest)
 
+    if rotated is None:
+        token_obj = await TokenRepository.get_by_digest(db, digest)
+        if token_obj and token_obj.revoked:
+            # A rotated-out token came back: assume it leaked and kill the whole chain
+            await TokenRepository.revoke_family(db, token_obj.family_id)
+            await db.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    new_token_obj = RefreshToken(
-        token=new_refresh,
-        user_id=token_obj.user_id,
-        tenant_id=token_obj.tenant_id,
-        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_MIN)
+    user_id, tenant_id, family_id = rotated
+    user = await UserRepository.get_by_id(db, user_id)
+    if not user or not user.is_active:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    new_refresh = create_refresh_token(str(user_id), tenant_id)
+    new_access = create_access_token(str(user_id), user_claims(user))
+
+    await TokenRepository.save_refresh_token(
+        db,
+        user_id=user_id,
+        tenant_id=tenant_id,
+        token_digest=token_digest(new_refresh),
+        family_id=family_id,
     )
-    db.add(new_token_obj)
     await db.commit()
-    await db.refresh(new_token_obj)
+    await audit_log.record(TOKEN_REFRESHED, tenant_id=tenant_id, user_id=user_id, ip=ip)
 
     return {"access_token": new_access, "refresh_token": new_refresh, "token_type": "bearer"}
 
@@ -118,22 +144,24 @@ async def refresh_token(refresh_token: str = Body(...), db: AsyncSession = Depen
 # LOGOUT
 # -------------------------
 @router.post("/logout")
-async def logout(refresh_token: str = Body(...), db: AsyncSession = Depends(get_db)):
-    stmt = select(RefreshToken).where(RefreshToken.token == refresh_token)
-    result = await db.execute(stmt)
-    token_obj = result.scalar_one_or_none()
-
-    if token_obj:
-        # Revoke all refresh tokens of this user within this tenant
-        stmt = select(RefreshToken).where(
-            RefreshToken.user_id == token_obj.user_id,
-            RefreshToken.tenant_id == token_obj.tenant_id
-        )
-        result = await db.execute(stmt)
-        all_tokens = result.scalars().all()
-        for t in all_tokens:
-            t.revoked = True
-        await db.commit()
+@sql_budget(4)  # token, revoke, epoch bump, notify
+async def logout(request: Request, refresh_token: str = Body(...)):
+    try:
+        tenant_id = refresh_token_tenant(refresh_token)
+    except JWTError:
+        return {"detail": "Logged out successfully"}
+
+    async with shard_router.sessionmaker_for(tenant_id)() as db:
+        token_obj = await TokenRepository.get_by_digest(db, token_digest(refresh_token))
+
+        if token_obj:
+            # Revoke all refresh tokens of this user within this tenant
+            await TokenRepository.revoke_for_user(db, token_obj.user_id, token_obj.tenant_id)
+            epoch = await bump_epoch(db, token_obj.user_id)
+            await event_bus.publish(db, TOKENS_REVOKED, user_id=str(token_obj.user_id), epoch=epoch)
+            await db.commit()
+            token_epochs.record(token_obj.user_id, epoch)
+            await audit_log.record(LOGOUT, tenant_id=token_obj.tenant_id, user_id=token_obj.user_id, ip=client_ip(request))
 
     return {"detail": "Logged out successfully"}
 
@@ -141,21 +169,75 @@ async def logout(refresh_token: str = Body(...), db: AsyncSession = Depends(get_
 # -------------------------
 # CURRENT USER
 # -------------------------
-@router.get("/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=CurrentUser)
+@sql_budget(1)
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
+    return current_user
 
-    return {
-        "id": current_user.user_id,
-        "email": current_user.email,
-        "role": current_user.role,
-        "tenant_id": current_user.tenant_id,
-        # "refresh_token": current_user.refresh_tokens
-    }
+
+# -------------------------
+# BATCH TOKEN INTROSPECTION (for gateways)
+# -------------------------
+@router.post("/introspect")
+@sql_budget(len(shard_router.engines))  # one lookup per shard
+async def introspect(
+    payload: IntrospectRequest,
+    request: Request,
+):
+    """
+    Same checks as get_current_user for up to INTROSPECT_MAX_TOKENS tokens.
+    Results come back in request order; user rows missing from the principal
+    cache are read with a single query per shard.
+    """
+    secret = settings.INTROSPECT_CLIENT_SECRET
+    if secret and not hmac.compare_digest(request.headers.get("x-introspect-secret", ""), secret):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid client credentials")
+
+    claims = {}
+    for token in set(payload.tokens):
+        try:
+            claims[token] = decode_token(token)
+        except HTTPException:
+            pass
+
+    by_shard = defaultdict(dict)
+    for token, claim in claims.items():
+        by_shard[shard_router.shard_for(claim.get("tid"))][token] = claim
+
+    principals = {}
+    for shard_claims in by_shard.values():
+        # primary, not replica: load_principals fills the principal cache
+        async with shard_router.sessionmaker_for(next(iter(shard_claims.values())).get("tid"))() as db:
+            if settings.AUTH_CLAIMS_MODE:
+                for token, claim in shard_claims.items():
+                    try:
+                        principals[token] = await principal_from_claims(claim, db)
+                    except HTTPException:
+                        pass
+            else:
+                by_user = await load_principals(db, [c["sub"] for c in shard_claims.values()])
+                principals.update({token: by_user.get(c["sub"]) for token, c in shard_claims.items()})
+
+    results = []
+    for token in payload.tokens:
+        principal = principals.get(token)
+        if principal is None or not principal.is_active:
+            results.append({"active": False})
+            continue
+        results.append({
+            "active": True,
+            "sub": str(principal.user_id),
+            "tenant_id": str(principal.tenant_id),
+            "role": principal.role,
+            "exp": claims[token]["exp"],
+        })
+    return {"results": results}
 
 
 # -------------------------
 # ADMIN-ONLY DATA
 # -------------------------
 @router.get("/admin/data")
-async def admin_data(current_user: User = Depends(require_role("admin"))):
+@sql_budget(1)
+async def admin_data(current_user: Principal = Depends(require_role("admin"))):
     return {"data": "Sensitive admin-only data"}
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.models.tenant import Tenant
-from app.api.deps import get_db
-from typing import List, Optional
+from app.api.deps import get_db, get_read_db
+from app.api.streaming import ndjson_response
+from app.core.config import settings
+from app.core.pagination import page
+from app.core.sql_profiler import sql_budget
+from app.repositories.tenant_repo import TenantRepository
+from app.schemas.pagination import Page
+from app.schemas.tenant import TenantOut
+from typing import Literal, Optional
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
@@ -11,24 +17,18 @@ router = APIRouter(prefix="/tenants", tags=["tenants"])
 # REGISTER TENANT
 # -------------------------
 @router.post("/register")
+@sql_budget(1)
 async def register_tenant(
     name: str = Body(..., embed=True),
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(Tenant).where(Tenant.name == name)
-    result = await db.execute(stmt)
-    existing_tenant = result.scalar_one_or_none()
-    if existing_tenant:
+    tenant = await TenantRepository.create(db, name)
+    if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tenant with name '{name}' already exists"
         )
 
-    tenant = Tenant(name=name)
-    db.add(tenant)
-    await db.commit()
-    await db.refresh(tenant)
-
     return {
         "tenant_id": str(tenant.tenant_id),
         "name": tenant.name,
@@ -39,24 +39,47 @@ async def register_tenant(
 # -------------------------
 # LIST TENANTS
 # -------------------------
-@router.get("/list", response_model=List[dict])
+def _tenant_row(t: Tenant) -> dict:  # ndjson lines and search results; JSON pages go through TenantOut
+    return {
+        "tenant_id": str(t.tenant_id),
+        "name": t.name,
+        "is_active": t.is_active,
+        "created_at": t.created_at.isoformat(),
+    }
+
+@router.get("/list", response_model=Page[TenantOut])
+@sql_budget(1)
 async def list_tenants(
     name: Optional[str] = Query(None, description="Filter tenants by name"),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every row after cursor"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    stmt = select(Tenant)
-    if name:
-        stmt = stmt.where(Tenant.name.ilike(f"%{name}%"))
+    if format == "ndjson":
+        stmt, params = TenantRepository.stream_query(name, cursor)
+        return ndjson_response(stmt, _tenant_row, params=params)
 
-    result = await db.execute(stmt)
-    tenants = result.scalars().all()
+    rows = await TenantRepository.page(db, name, cursor, limit)
+    return page(rows, limit, "created_at", "tenant_id")
 
-    return [
-        {
-            "tenant_id": str(t.tenant_id),
-            "name": t.name,
-            "is_active": t.is_active,
-            "created_at": t.created_at
-        }
-        for t in tenants
-    ]
+# -------------------------
+# SEARCH TENANTS
+# -------------------------
+@router.get("/search")
+@sql_budget(1)
+async def search_tenants(
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: Literal["prefix", "substring", "fuzzy"] = Query("substring"),
+    limit: int = Query(settings.TENANT_SEARCH_LIMIT_DEFAULT, ge=1, le=settings.TENANT_SEARCH_LIMIT_MAX),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    prefix    -> lower(name) LIKE 'q%'   (ix_tenants_name_lower_pattern)
+    substring -> name ILIKE '%q%'        (ix_tenants_name_trgm)
+    fuzzy     -> name % q, by similarity (ix_tenants_name_trgm)
+    """
+    rows = await TenantRepository.search(db, q, mode, limit)
+    if mode != "fuzzy":
+        return {"items": [_tenant_row(t) for t in rows]}
+    return {"items": [{**_tenant_row(t), "score": round(s, 4)} for t, s in rows]}
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from datetime import datetime
+from typing import Literal, Optional
 
-from app.api.deps import get_db, require_role
+from app.api.deps import get_tenant_db, get_tenant_read_db, require_role
+from app.api.streaming import csv_response, ndjson_response
 from app.models.user import User
-from app.core.security import hash_password
+from app.core.config import settings
+from app.core.pagination import page
+from app.core.hashing import hash_password
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_epochs import bump_epoch, token_epochs
+from app.core.events import USER_CHANGED, USER_DELETED, event_bus
+from app.repositories.user_repo import UserRepository
+from app.core.rate_limit import client_ip
+from app.core.sql_profiler import sql_budget
+from app.services.audit_log import USER_DELETED as AUDIT_USER_DELETED, USER_PASSWORD_RESET, USER_UPDATED, audit_log
+from app.services.user_import import UserImportService
+from app.schemas.pagination import Page
+from app.schemas.user import UserOut, UserRow
 
 router = APIRouter(
     prefix="/users",
@@ -15,46 +28,110 @@ router = APIRouter(
 # -----------------------------
 # Get all users for tenant
 # -----------------------------
-@router.get("/", response_model=List[dict])
+def _user_row(u: User) -> dict:  # ndjson lines; JSON pages go through UserRow
+    return {
+        "id": str(u.user_id),
+        "email": u.email,
+        "role": u.role,
+        "is_active": u.is_active,
+        "created_at": u.created_at.isoformat(),
+    }
+
+@router.get("/", response_model=Page[UserRow])
+@sql_budget(2)
 async def list_users(
-    current_user: User = Depends(require_role("admin", "manager")),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every row after cursor"),
+    current_user: Principal = Depends(require_role("admin", "manager")),
+    db: AsyncSession = Depends(get_tenant_read_db)
+):
+    if format == "ndjson":
+        stmt, params = UserRepository.stream_query(current_user.tenant_id, cursor)
+        return ndjson_response(stmt, _user_row, params=params, tenant_id=current_user.tenant_id)
+
+    rows = await UserRepository.page(db, current_user.tenant_id, cursor, limit)
+    return page(rows, limit, "created_at", "user_id")
+
+# -----------------------------
+# Export all users of the tenant
+# -----------------------------
+EXPORT_COLUMNS = ["id", "email", "role", "is_active", "created_at", "updated_at"]
+
+def _export_row(u: User) -> dict:
+    return {
+        "id": str(u.user_id),
+        "email": u.email,
+        "role": u.role,
+        "is_active": u.is_active,
+        "created_at": u.created_at.isoformat(),
+        "updated_at": u.updated_at.isoformat(),
+    }
+
+@router.get("/export")
+@sql_budget(2)
+async def export_users(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    updated_since: Optional[datetime] = Query(None, description="only users changed at or after this time"),
+    fetch_size: int = Query(settings.EXPORT_FETCH_SIZE_DEFAULT, ge=1, le=settings.EXPORT_FETCH_SIZE_MAX),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """
+    Streams through a server-side cursor, ordered by (updated_at, id): the
+    last updated_at seen is the `updated_since` of the next incremental export.
+    """
+    stmt, params = UserRepository.export_query(current_user.tenant_id, updated_since)
+
+    headers = {"Content-Disposition": f'attachment; filename="users.{format}"'}
+    if format == "ndjson":
+        return ndjson_response(stmt, _export_row, fetch_size, headers, params, current_user.tenant_id)
+    return csv_response(stmt, EXPORT_COLUMNS, _export_row, fetch_size, headers, params, current_user.tenant_id)
+
+# -----------------------------
+# Bulk import users into the caller's tenant
+# -----------------------------
+@router.post("/bulk")  # no @sql_budget: two statements per BULK_IMPORT_BATCH_SIZE rows, as many as uploaded
+async def bulk_import_users(
+    request: Request,
+    current_user: Principal = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_tenant_db)
 ):
-    stmt = select(User).where(User.tenant_id == current_user.tenant_id)
-    result = await db.execute(stmt)
-    users = result.scalars().all()
-    return [{"id": u.id, "email": u.email, "role": u.role, "is_active": u.is_active} for u in users]
+    """
+    Body is streamed: text/csv with an `email,password[,role]` header, or
+    NDJSON objects with the same fields. Returns a per-row report.
+    """
+    rows = UserImportService.iter_rows(request)
+    return await UserImportService.import_users(db, current_user.tenant_id, rows)
 
 # -----------------------------
 # Get specific user by ID
 # -----------------------------
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=UserOut)
+@sql_budget(2)
 async def get_user(
     user_id: str,
-    current_user: User = Depends(require_role("admin", "manager")),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(require_role("admin", "manager")),
+    db: AsyncSession = Depends(get_tenant_read_db)
 ):
-    stmt = select(User).where(User.id == user_id, User.tenant_id == current_user.tenant_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await UserRepository.get_in_tenant(db, user_id, current_user.tenant_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"id": user.id, "email": user.email, "role": user.role, "is_active": user.is_active}
+    return user
 
 # -----------------------------
 # Update user role or status
 # -----------------------------
-@router.patch("/{user_id}")
+@router.patch("/{user_id}", response_model=UserOut)
+@sql_budget(6)  # principal, user, epoch bump, update, notify, refresh
 async def update_user(
     user_id: str,
+    request: Request,
     role: str = Body(None),
     is_active: bool = Body(None),
-    current_user: User = Depends(require_role("admin")),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_tenant_db)
 ):
-    stmt = select(User).where(User.id == user_id, User.tenant_id == current_user.tenant_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await UserRepository.get_in_tenant(db, user_id, current_user.tenant_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -63,45 +140,72 @@ async def update_user(
     if is_active is not None:
         user.is_active = is_active
 
+    epoch = None
+    if role or is_active is not None:
+        # outstanding access tokens carry the old role/status
+        epoch = await bump_epoch(db, user.user_id)
+    await event_bus.publish(db, USER_CHANGED, user_id=str(user.user_id), epoch=epoch)
     await db.commit()
     await db.refresh(user)
-    return {"id": user.id, "email": user.email, "role": user.role, "is_active": user.is_active}
+    principal_cache.invalidate(user.user_id)
+    if epoch is not None:
+        token_epochs.record(user.user_id, epoch)
+    await audit_log.record(
+        USER_UPDATED, tenant_id=user.tenant_id, user_id=user.user_id, actor_id=current_user.user_id,
+        ip=client_ip(request), role=role, is_active=is_active,
+    )
+    return user
 
 # -----------------------------
 # Reset user password
 # -----------------------------
 @router.post("/{user_id}/reset-password")
+@sql_budget(5)  # principal, user, epoch bump, notify, update
 async def reset_password(
     user_id: str,
+    request: Request,
     new_password: str = Body(...),
-    current_user: User = Depends(require_role("admin")),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_tenant_db)
 ):
-    stmt = select(User).where(User.id == user_id, User.tenant_id == current_user.tenant_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await UserRepository.get_in_tenant(db, user_id, current_user.tenant_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = await hash_password(new_password)
+    epoch = await bump_epoch(db, user.user_id)
+    await event_bus.publish(db, USER_CHANGED, user_id=str(user.user_id), epoch=epoch)
     await db.commit()
+    principal_cache.invalidate(user.user_id)
+    token_epochs.record(user.user_id, epoch)
+    await audit_log.record(
+        USER_PASSWORD_RESET, tenant_id=user.tenant_id, user_id=user.user_id, actor_id=current_user.user_id,
+        ip=client_ip(request),
+    )
     return {"detail": "Password reset successfully"}
 
 # -----------------------------
 # Delete user
 # -----------------------------
 @router.delete("/{user_id}")
+@sql_budget(4)  # principal, user, notify, delete; the database cascades to the tokens
 async def delete_user(
     user_id: str,
-    current_user: User = Depends(require_role("admin")),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_tenant_db)
 ):
-    stmt = select(User).where(User.id == user_id, User.tenant_id == current_user.tenant_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await UserRepository.get_in_tenant(db, user_id, current_user.tenant_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     await db.delete(user)
+    await event_bus.publish(db, USER_DELETED, user_id=str(user.user_id))
     await db.commit()
+    principal_cache.invalidate(user.user_id)
+    token_epochs.forget(user.user_id)
+    await audit_log.record(
+        AUDIT_USER_DELETED, tenant_id=user.tenant_id, user_id=user.user_id, actor_id=current_user.user_id,
+        ip=client_ip(request), email=user.email,
+    )
     return {"detail": "User deleted successfully"}
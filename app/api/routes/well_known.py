@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+from app.core.config import settings
+from app.core.jwt_keys import key_ring
+from app.core.sql_profiler import sql_budget
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+# -------------------------
+# JWKS: public keys for verifying access tokens locally
+# -------------------------
+@router.get("/jwks.json")
+@sql_budget(0)
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SEC}"
+    return key_ring.jwks()
@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.db.shards import shard_router
+
+
+async def _stream_scalars(stmt, fetch_size: int | None, params: dict | None, tenant_id=None):
+    """
+    Yield the rows of `stmt` through a server-side cursor, `fetch_size` at a time.
+    The generator owns its (read) session on the tenant's shard so it outlives
+    the request dependencies.
+    """
+    factory = await shard_router.read_sessionmaker_for(tenant_id)
+    async with factory() as session:
+        result = await session.stream_scalars(
+            stmt, params, execution_options={"yield_per": fetch_size or settings.STREAM_FETCH_SIZE}
+        )
+        async for obj in result:
+            yield obj
+
+
+def ndjson_response(stmt, serialize, fetch_size: int | None = None, headers: dict | None = None,
+                    params: dict | None = None, tenant_id=None) -> StreamingResponse:
+    async def lines():
+        async for obj in _stream_scalars(stmt, fetch_size, params, tenant_id):
+            yield json.dumps(serialize(obj)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
+
+
+def csv_response(stmt, columns: list[str], serialize, fetch_size: int | None = None, headers: dict | None = None,
+                 params: dict | None = None, tenant_id=None) -> StreamingResponse:
+    async def lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        async for obj in _stream_scalars(stmt, fetch_size, params, tenant_id):
+            writer.writerow(serialize(obj))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return StreamingResponse(lines(), media_type="text/csv", headers=headers)
@@ -0,0 +1,68 @@
+"""
+Pick argon2id parameters for this machine.
+
+    python -m app.core.argon2_calibration --target-ms 250 --memory-mib 64
+
+Memory is fixed at the budget (it is what makes GPU cracking expensive) and
+time cost is raised until one hash takes at least the target. If even one
+pass over the budget is too slow, memory is halved instead. Prints the
+ARGON2_* settings to put in the environment; existing hashes are upgraded on
+each user's next login.
+"""
+import argparse
+import statistics
+import time
+from argon2 import PasswordHasher
+
+MIN_MEMORY_KIB = 19 * 1024  # OWASP floor for argon2id
+MAX_TIME_COST = 20
+
+
+def measure(time_cost: int, memory_kib: int, parallelism: int, samples: int = 3) -> float:
+    """Median seconds per hash."""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target_sec: float, memory_kib: int, parallelism: int) -> dict:
+    while True:
+        elapsed = measure(1, memory_kib, parallelism)
+        if elapsed <= target_sec or memory_kib // 2 < MIN_MEMORY_KIB:
+            break
+        memory_kib //= 2
+
+    time_cost = 1
+    while elapsed < target_sec and time_cost < MAX_TIME_COST:
+        time_cost += 1
+        elapsed = measure(time_cost, memory_kib, parallelism)
+
+    return {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST_KIB": memory_kib,
+        "ARGON2_PARALLELISM": parallelism,
+        "measured_ms": round(elapsed * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latency per hash to aim for")
+    parser.add_argument("--memory-mib", type=int, default=64, help="memory budget per hash")
+    parser.add_argument("--parallelism", type=int, default=1,
+                        help="lanes per hash; keep 1 when HASH_POOL_SIZE already uses every core")
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms / 1000, args.memory_mib * 1024, args.parallelism)
+    measured = result.pop("measured_ms")
+    for key, value in result.items():
+        print(f"{key}={value}")
+    print(f"# {measured} ms per hash on this machine")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,110 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MIN: int = 5
     REFRESH_TOKEN_EXPIRE_MIN: int = 60 * 24 * 7  # 7 days
+    REFRESH_TOKEN_DIGEST_KEY: str | None = None  # falls back to JWT_REFRESH_SECRET_KEY
+
+    # asymmetric access tokens (see app.core.jwt_keys); first private key signs
+    JWT_PRIVATE_KEY_FILES: list[str] = []
+    JWT_PUBLIC_KEY_FILES: list[str] = []  # retired keys that still verify
+    JWKS_CACHE_MAX_AGE_SEC: int = 300
+
+    # POST /auth/introspect
+    INTROSPECT_MAX_TOKENS: int = 100
+    INTROSPECT_CLIENT_SECRET: str | None = None  # when set, callers must send X-Introspect-Secret
+
+    # database pools
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256
+
+    # cross-worker change events (app.core.events)
+    EVENT_BUS_BACKEND: str = "postgres"  # "postgres" (LISTEN/NOTIFY) or "loopback"
+    EVENT_BUS_CHANNEL: str = "app_events"
+    EVENT_BUS_KEEPALIVE_SEC: float = 30.0
+    EVENT_BUS_MAX_BACKOFF_SEC: float = 30.0
+
+    # tenant sharding (app.db.shards); unmapped tenants stay on DATABASE_URL
+    DATABASE_SHARDS: dict[str, dict[str, str]] = {}  # {"eu1": {"url": "...", "schema": "..."}}, both optional
+    TENANT_SHARD_MAP: dict[str, str] = {}  # {"<tenant_id>": "eu1"}
+
+    # write-behind audit log (app.services.audit_log)
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_OVERFLOW_POLICY: str = "drop"  # "drop" (counted in audit_events_dropped_total) or "block"
+    AUDIT_DRAIN_TIMEOUT_SEC: float = 10.0
+
+    # per-request SQL profile (app.core.sql_profiler); development and tests only
+    SQL_PROFILE_ENABLED: bool = False
+    SQL_PROFILE_REPEAT_THRESHOLD: int = 3  # identical statements in one request flagged as N+1
+    SQL_PROFILE_EXPLAIN_MS: float | None = None  # capture plans of statements slower than this
+
+    # startup warm-up; /ready stays 503 until it is done
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 5  # capped at DB_POOL_SIZE
+    WARMUP_RETRY_SEC: float = 5.0
+
+    # optional read replica for read-only routes
+    DATABASE_READ_URL: str | None = None
+    READ_REPLICA_MAX_LAG_SEC: float = 5.0
+    READ_REPLICA_CHECK_INTERVAL_SEC: float = 5.0
+
+    # argon2 worker pool
+    HASH_POOL_SIZE: int = 2
+    HASH_POOL_QUEUE_DEPTH: int = 32  # waiting jobs allowed on top of HASH_POOL_SIZE
+    HASH_TIMEOUT_SEC: float = 5.0
+
+    # argon2 cost; None keeps passlib's defaults (see app.core.argon2_calibration)
+    ARGON2_TIME_COST: int | None = None
+    ARGON2_MEMORY_COST_KIB: int | None = None
+    ARGON2_PARALLELISM: int | None = None
+
+    # login/register throttling, N requests per window; 0 disables a limit
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW_SEC: float = 60.0
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 10
+    REGISTER_RATE_LIMIT_PER_IP: int = 10
+    # {"<tenant_id>": {"login_email": 50}}; logins without tenant_id are held to the defaults first
+    RATE_LIMIT_TENANT_OVERRIDES: dict[str, dict[str, int]] = {}
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # only behind a proxy that sets X-Forwarded-For
+
+    # get_current_user principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SEC: float = 60.0
+
+    # authorize from access token claims, checking only the per-user token epoch
+    AUTH_CLAIMS_MODE: bool = False
+    TOKEN_EPOCH_REFRESH_SEC: float = 5.0
+    TOKEN_EPOCH_SYNC_OVERLAP_SEC: float = 30.0
+
+    # list endpoints
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    STREAM_FETCH_SIZE: int = 1000  # rows per server-side cursor fetch
+    TENANT_SEARCH_LIMIT_DEFAULT: int = 20
+    TENANT_SEARCH_LIMIT_MAX: int = 100
+
+    # expired/revoked refresh token cleanup
+    TOKEN_REAPER_ENABLED: bool = True
+    TOKEN_REAPER_BATCH_SIZE: int = 500
+    TOKEN_REAPER_INTERVAL_SEC: float = 60.0
+    TOKEN_REAPER_LOCK_TIMEOUT_MS: int = 2000
+    TOKEN_REAPER_REVOKED_RETENTION_MIN: int = 60 * 24  # keep revoked rows this long for reuse detection
+    TOKEN_PARTITION_MONTHS_AHEAD: int = 2  # only used when refresh_tokens is partitioned
+
+    # POST /users/bulk
+    BULK_IMPORT_BATCH_SIZE: int = 500
+    BULK_IMPORT_MAX_ROWS: int = 100_000
+
+    # GET /users/export
+    EXPORT_FETCH_SIZE_DEFAULT: int = 2000
+    EXPORT_FETCH_SIZE_MAX: int = 20_000
     
     class Config:
         env_file = ".env"
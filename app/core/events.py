@@ -0,0 +1,180 @@
+"""
+Change events shared between workers, so in-process state (principal cache,
+token epochs) follows writes made by any worker on any host.
+
+Publishing runs pg_notify() inside the writer's transaction: Postgres only
+delivers it on commit, and drops it on rollback. Each worker LISTENs on a
+dedicated connection to every shard database. NOTIFY is not durable, so after
+a reconnect the catch-up hooks rebuild whatever could have been missed.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+import asyncpg
+from sqlalchemy import bindparam, select, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+USER_CHANGED = "user.changed"  # role/status/password; carries the new token epoch if bumped
+USER_DELETED = "user.deleted"
+TOKENS_REVOKED = "tokens.revoked"  # logout; carries the new token epoch
+
+_NOTIFY = select(func.pg_notify(bindparam("channel"), bindparam("payload")))
+
+
+class EventBackend(ABC):
+    @abstractmethod
+    async def publish(self, db: AsyncSession, message: dict):
+        """Send `message` to every worker once the transaction of `db` commits."""
+
+    async def start(self, bus: "EventBus"):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class LoopbackEventBackend(EventBackend):
+    """Delivers straight back to this process; for tests and single-worker setups."""
+
+    def __init__(self):
+        self._bus: EventBus | None = None
+
+    async def start(self, bus):
+        self._bus = bus
+
+    async def publish(self, db, message):
+        if self._bus is not None:
+            await self._bus.dispatch({**message, "origin": None})
+
+
+class PostgresEventBackend(EventBackend):
+    def __init__(self, dsns: list[str], channel: str, keepalive: float, max_backoff: float):
+        self.dsns = dsns
+        self.channel = channel
+        self.keepalive = keepalive
+        self.max_backoff = max_backoff
+        self._tasks: list[asyncio.Task] = []
+
+    async def publish(self, db, message):
+        await db.execute(_NOTIFY, {"channel": self.channel, "payload": json.dumps(message)})
+
+    async def start(self, bus):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen(bus, dsn)) for dsn in self.dsns]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _listen(self, bus: "EventBus", dsn: str):
+        backoff = 1.0
+        missed = False  # anything published while we were not listening is gone
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(self.channel, lambda *args: bus.on_payload(args[-1]))
+                if missed:
+                    await bus.catch_up()
+                backoff = 1.0
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive)
+                    except TimeoutError:
+                        # notices half-open connections; one that does not answer is lost too
+                        await asyncio.wait_for(conn.execute("SELECT 1"), self.keepalive)
+            except (OSError, TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.warning("Event bus connection lost, reconnecting in %.0fs", backoff, exc_info=True)
+            finally:
+                missed = True
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+class EventBus:
+    """
+    publish() inside the transaction making the change; handlers run on every
+    other worker. The publishing worker applies its own change directly.
+    """
+
+    def __init__(self, backend: EventBackend):
+        self.backend = backend
+        self.origin = uuid.uuid4().hex
+        self._handlers = defaultdict(list)
+        self._catch_up = []
+        self._pending: set[asyncio.Task] = set()
+
+    def subscribe(self, event_type: str, handler):
+        self._handlers[event_type].append(handler)
+
+    def on_catch_up(self, hook):
+        """Async hook run after a reconnect, for events that may have been missed."""
+        self._catch_up.append(hook)
+
+    async def publish(self, db: AsyncSession, event_type: str, **data):
+        await self.backend.publish(db, {"type": event_type, "origin": self.origin, **data})
+
+    def on_payload(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed event %r", payload)
+            return
+        task = asyncio.create_task(self.dispatch(message))
+        self._pending.add(task)  # keep a reference until it finishes
+        task.add_done_callback(self._pending.discard)
+
+    async def dispatch(self, message: dict):
+        if message.get("origin") == self.origin:
+            return
+        for handler in self._handlers.get(message.get("type"), ()):
+            try:
+                result = handler(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception("Event handler failed for %s", message.get("type"))
+
+    async def catch_up(self):
+        for hook in self._catch_up:
+            try:
+                await hook()
+            except Exception:
+                logger.exception("Event bus catch-up failed")
+
+    async def start(self):
+        await self.backend.start(self)
+
+    async def stop(self):
+        await self.backend.stop()
+
+
+def _make_backend() -> EventBackend:
+    if settings.EVENT_BUS_BACKEND == "loopback":
+        return LoopbackEventBackend()
+    # a publisher notifies on its tenant's shard, so listen on every shard database
+    urls = {settings.DATABASE_URL} | {s.get("url", settings.DATABASE_URL) for s in settings.DATABASE_SHARDS.values()}
+    dsns = sorted(make_url(url).set(drivername="postgresql").render_as_string(hide_password=False) for url in urls)
+    return PostgresEventBackend(
+        dsns,
+        channel=settings.EVENT_BUS_CHANNEL,
+        keepalive=settings.EVENT_BUS_KEEPALIVE_SEC,
+        max_backoff=settings.EVENT_BUS_MAX_BACKOFF_SEC,
+    )
+
+
+event_bus = EventBus(_make_backend())
@@ -0,0 +1,104 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core import security
+from app.core.metrics import HASH_LATENCY, Gauge
+
+
+class HashingPool:
+    """
+    Runs argon2 work in a process pool so it never blocks the event loop.
+    At most `size + queue_depth` jobs are admitted; anything beyond that is
+    rejected with 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, size: int, queue_depth: int, timeout: float):
+        self.size = size
+        self.capacity = size + queue_depth
+        self.timeout = timeout
+        self.in_flight = 0
+        # batch jobs (bulk imports) leave a worker free for logins, across all imports
+        self.batch_workers = max(1, size - 1)
+        self.batch_slots = asyncio.Semaphore(self.batch_workers)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.size)
+        return self._executor
+
+    def _release(self, _future):
+        self.in_flight -= 1
+
+    async def run(self, fn, *args, timeout: float | None = None):
+        if self.in_flight >= self.capacity:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+            )
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        self.in_flight += 1
+        # the slot is held until the worker is actually done, even if we time out
+        future.add_done_callback(lambda f: self._release(f) if loop.is_closed() else loop.call_soon_threadsafe(self._release, f))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    size=settings.HASH_POOL_SIZE,
+    queue_depth=settings.HASH_POOL_QUEUE_DEPTH,
+    timeout=settings.HASH_TIMEOUT_SEC,
+)
+
+
+Gauge("hash_pool_in_flight", "argon2 jobs running or queued", callback=lambda: hashing_pool.in_flight)
+
+
+async def _timed(operation: str, fn, *args, **kwargs):
+    # measured here, not in the worker, so pool queueing shows up too
+    start = time.perf_counter()
+    try:
+        return await hashing_pool.run(fn, *args, **kwargs)
+    finally:
+        HASH_LATENCY.observe(time.perf_counter() - start, operation=operation)
+
+
+async def hash_password(password: str) -> str:
+    return await _timed("hash", security.hash_password, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _timed("verify", security.verify_password, password, hashed)
+
+async def verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    """Like verify_password, plus a re-hash with current parameters when the stored one is outdated."""
+    return await _timed("verify", security.verify_and_update, password, hashed)
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a batch spread over the pool's batch workers, one job per worker."""
+    if not passwords:
+        return []
+    chunk = math.ceil(len(passwords) / hashing_pool.batch_workers)
+    parts = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+
+    async def hash_part(part: list[str]) -> list[str]:
+        async with hashing_pool.batch_slots:
+            return await _timed("hash_batch", security.hash_passwords, part, timeout=hashing_pool.timeout * len(part))
+
+    results = await asyncio.gather(*(hash_part(part) for part in parts))
+    return [h for part in results for h in part]
@@ -0,0 +1,89 @@
+"""
+Access token signing keys.
+
+With JWT_PRIVATE_KEY_FILES set, access tokens are signed with the first key
+(RS256 for RSA, ES256 for EC P-256) and carry its `kid`. Every listed key, plus
+JWT_PUBLIC_KEY_FILES for retired keys whose private half is gone, keeps
+verifying and is published at /.well-known/jwks.json. Rotate by putting the
+new key first and dropping the old one after ACCESS_TOKEN_EXPIRE_MIN.
+
+Without it, tokens stay HS256 with JWT_SECRET_KEY and the JWKS is empty.
+"""
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jose import jwk
+from jose.backends.base import Key
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: str
+    algorithm: str
+    key: Key  # constructed once; jose would otherwise re-parse the PEM per token
+    public_jwk: dict
+
+
+def _algorithm(public_key) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(public_key.curve, ec.SECP256R1):
+        return "ES256"
+    raise ValueError(f"Unsupported JWT key type: {type(public_key).__name__} (use RSA or EC P-256)")
+
+
+def _thumbprint(public_jwk: dict) -> str:
+    """RFC 7638 JWK thumbprint, so a key's kid is stable across restarts and hosts."""
+    members = ("e", "kty", "n") if public_jwk["kty"] == "RSA" else ("crv", "kty", "x", "y")
+    canonical = json.dumps({m: public_jwk[m] for m in members}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical.encode()).digest()).decode().rstrip("=")
+
+
+def _load(pem: bytes, private: bool) -> tuple[Key | None, VerificationKey]:
+    crypto_key = load_pem_private_key(pem, password=None) if private else load_pem_public_key(pem)
+    public_key = crypto_key.public_key() if private else crypto_key
+    algorithm = _algorithm(public_key)
+
+    public = jwk.construct(public_key, algorithm)
+    public_jwk = public.to_dict()
+    kid = _thumbprint(public_jwk)
+    public_jwk.update(kid=kid, use="sig")
+    signer = jwk.construct(crypto_key, algorithm) if private else None
+    return signer, VerificationKey(kid, algorithm, public, public_jwk)
+
+
+class KeyRing:
+    def __init__(self, private_pems: list[bytes], public_pems: list[bytes]):
+        self.signing: tuple[str, str, Key] | None = None  # (kid, algorithm, private key)
+        self.verification: dict[str, VerificationKey] = {}
+
+        for i, pem in enumerate(private_pems):
+            signer, key = _load(pem, private=True)
+            if i == 0:
+                self.signing = (key.kid, key.algorithm, signer)
+            self.verification[key.kid] = key
+        for pem in public_pems:
+            _, key = _load(pem, private=False)
+            self.verification.setdefault(key.kid, key)
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.signing is not None
+
+    def jwks(self) -> dict:
+        return {"keys": [k.public_jwk for k in self.verification.values()]}
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        return cls(
+            [Path(p).read_bytes() for p in settings.JWT_PRIVATE_KEY_FILES],
+            [Path(p).read_bytes() for p in settings.JWT_PUBLIC_KEY_FILES],
+        )
+
+
+key_ring = KeyRing.from_settings()
@@ -1,11 +1,55 @@
+import uuid
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.jwt_keys import key_ring
+from app.core.metrics import JWT_LATENCY
 
-def create_access_token(sub: str):
+def user_claims(user) -> dict:
+    """Claims that let claims-mode auth authorize without reading the user row."""
+    return {
+        "tid": str(user.tenant_id),
+        "email": user.email,
+        "role": user.role,
+        "ep": user.token_epoch or 0,
+    }
+
+@JWT_LATENCY.time(operation="encode")
+def create_access_token(sub: str, claims: dict | None = None):
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MIN)
-    return jwt.encode({"sub": sub, "exp": expire}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    payload = {**(claims or {}), "sub": sub, "exp": expire}
+    if key_ring.asymmetric:
+        kid, algorithm, key = key_ring.signing
+        return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+@JWT_LATENCY.time(operation="decode")
+def decode_access_token(token: str) -> dict:
+    """Verify signature and expiry; raises jose.JWTError on failure."""
+    if key_ring.asymmetric:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = key_ring.verification.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key.key, algorithms=[key.algorithm])
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
 
-def create_refresh_token(sub: str):
+@JWT_LATENCY.time(operation="encode")
+def create_refresh_token(sub: str, tenant_id=None):
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MIN)
-    return jwt.encode({"sub": sub, "exp": expire}, settings.JWT_REFRESH_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    # jti keeps tokens issued in the same second distinct (their digests are unique)
+    payload = {"sub": sub, "exp": expire, "jti": uuid.uuid4().hex}
+    if tenant_id is not None:
+        payload["tid"] = str(tenant_id)  # routes refresh/logout to the tenant's shard
+    return jwt.encode(payload, settings.JWT_REFRESH_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+@JWT_LATENCY.time(operation="decode")
+def refresh_token_tenant(token: str) -> str | None:
+    """
+    Tenant a refresh token was issued for. Expiry is not checked here: the
+    stored row decides validity, this only picks the shard to look in.
+    Raises jose.JWTError for a forged or malformed token.
+    """
+    payload = jwt.decode(token, settings.JWT_REFRESH_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM],
+                         options={"verify_exp": False})
+    return payload.get("tid")
@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, tuple_
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset(stmt, created_col, id_col, after: bool):
+    """
+    Order `stmt` by (created_at, id) and, when `after`, start past the
+    :after_created_at / :after_id bind parameters (see cursor_params).
+    The row comparison is served by a composite index on those columns.
+    """
+    if after:
+        stmt = stmt.where(tuple_(created_col, id_col) > tuple_(
+            bindparam("after_created_at", type_=created_col.type),
+            bindparam("after_id", type_=id_col.type),
+        ))
+    return stmt.order_by(created_col, id_col)
+
+
+def cursor_params(cursor: str | None) -> dict:
+    if not cursor:
+        return {}
+    created_at, row_id = decode_cursor(cursor)
+    return {"after_created_at": created_at, "after_id": row_id}
+
+
+def page(rows: list, limit: int, created_attr: str, id_attr: str, serialize=None) -> dict:
+    """
+    Build a page from `limit + 1` fetched rows. Items stay ORM rows unless
+    `serialize` is given; the route's response model reads their attributes.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_attr), getattr(last, id_attr))
+    if serialize is not None:
+        rows = [serialize(r) for r in rows]
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+from app.core.config import settings
+from app.core.events import USER_CHANGED, USER_DELETED, event_bus
+from app.core.metrics import Counter, Gauge
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The subset of a User that authentication and authorization need."""
+    user_id: UUID
+    tenant_id: UUID
+    email: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            user_id=user.user_id,
+            tenant_id=user.tenant_id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+
+class PrincipalCache:
+    """
+    Bounded TTL + LRU cache of principals keyed by user_id.
+    Lives in-process; handlers that change a user must call invalidate().
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id) -> Principal | None:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return principal
+
+    def set(self, principal: Principal):
+        key = str(principal.user_id)
+        self._entries[key] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id):
+        self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SEC,
+)
+
+Counter("principal_cache_hits_total", "get_current_user cache hits", callback=lambda: principal_cache.hits)
+Counter("principal_cache_misses_total", "get_current_user cache misses", callback=lambda: principal_cache.misses)
+Counter("principal_cache_evictions_total", "LRU and TTL evictions", callback=lambda: principal_cache.evictions)
+Gauge("principal_cache_size", "Cached principals", callback=lambda: len(principal_cache._entries))
+
+# changes made by other workers; after a missed-events window start over
+event_bus.subscribe(USER_CHANGED, lambda event: principal_cache.invalidate(event["user_id"]))
+event_bus.subscribe(USER_DELETED, lambda event: principal_cache.invalidate(event["user_id"]))
+
+
+async def _clear_principals():
+    principal_cache.clear()
+
+
+event_bus.on_catch_up(_clear_principals)
@@ -0,0 +1,110 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+from app.core.metrics import Counter
+
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected by the rate limiter", ("limit",))
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets. A shared backend (Redis, memcached, ...) only
+    has to implement acquire() atomically for every app worker to share limits.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, capacity: int, window: float) -> float:
+        """
+        Take one token from the bucket `key`, which holds `capacity` tokens and
+        refills completely over `window` seconds. Returns 0.0 when allowed,
+        otherwise the seconds until a token is available.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded LRU so a spray of keys cannot grow memory."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated)
+
+    async def acquire(self, key: str, capacity: int, window: float) -> float:
+        now = time.monotonic()
+        rate = capacity / window
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / rate
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class RateLimiter:
+    """
+    Named limits ("login_ip", "login_email", "register_ip") of N requests per
+    window, with optional per-tenant overrides: {tenant_id: {name: N}}.
+    A limit of 0 disables it.
+    """
+
+    def __init__(self, backend: RateLimitBackend, limits: dict[str, int], window: float,
+                 tenant_overrides: dict[str, dict[str, int]] | None = None, enabled: bool = True):
+        self.backend = backend
+        self.limits = limits
+        self.window = window
+        self.tenant_overrides = tenant_overrides or {}
+        self.enabled = enabled
+
+    def limit(self, name: str, tenant_id=None) -> int:
+        if tenant_id is not None:
+            override = self.tenant_overrides.get(str(tenant_id), {}).get(name)
+            if override is not None:
+                return override
+        return self.limits.get(name, 0)
+
+    async def check(self, name: str, key: str, limit: int | None = None):
+        """Raise 429 with Retry-After when `key` is over the `name` limit."""
+        if limit is None:
+            limit = self.limits.get(name, 0)
+        if not self.enabled or limit <= 0:
+            return
+        retry_after = await self.backend.acquire(f"{name}:{key}", limit, self.window)
+        if retry_after > 0:
+            RATE_LIMITED.inc(limit=name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+rate_limiter = RateLimiter(
+    backend=MemoryRateLimitBackend(maxsize=settings.RATE_LIMIT_MAX_KEYS),
+    limits={
+        "login_ip": settings.LOGIN_RATE_LIMIT_PER_IP,
+        "login_email": settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+        "register_ip": settings.REGISTER_RATE_LIMIT_PER_IP,
+    },
+    window=settings.RATE_LIMIT_WINDOW_SEC,
+    tenant_overrides=settings.RATE_LIMIT_TENANT_OVERRIDES,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
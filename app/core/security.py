@@ -1,27 +1,43 @@
+import hashlib
+import hmac
 from passlib.context import CryptContext
-from datetime import datetime, timedelta, timezone
-from jose import jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Unset ARGON2_* settings keep passlib's defaults; run
+# `python -m app.core.argon2_calibration` to pick values for this hardware.
+# Hashes made with other parameters verify fine and are upgraded on login.
+_argon2_params = {
+    "argon2__rounds": settings.ARGON2_TIME_COST,
+    "argon2__memory_cost": settings.ARGON2_MEMORY_COST_KIB,
+    "argon2__parallelism": settings.ARGON2_PARALLELISM,
+}
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    **{k: v for k, v in _argon2_params.items() if v is not None},
+)
 
 #password
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(p) for p in passwords]
+
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
-#refresh token
-def hash_token(token: str) -> str:
-    return pwd_context.hash(token)
 
-def verify_hashed_token(raw: str, hashed: str) -> bool:
-    return pwd_context.verify(raw, hashed)
+def verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    """(valid, new hash) where the new hash is only set when the parameters are outdated."""
+    return pwd_context.verify_and_update(password, hashed)
 
-def create_refresh_token(sub: str):
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_MIN)
-    return jwt.encode({"sub": sub, "exp": expire}, settings.JWT_REFRESH_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-#jwt
-def create_access_token(sub: str):
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MIN)
-    return jwt.encode({"sub": sub, "exp": expire}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+def needs_update(hashed: str) -> bool:
+    return pwd_context.needs_update(hashed)
+#refresh token
+def token_digest(token: str) -> str:
+    """
+    Keyed HMAC-SHA256 of a refresh token. Deterministic, so the stored value
+    can be found with a plain indexed equality lookup.
+    """
+    key = settings.REFRESH_TOKEN_DIGEST_KEY or settings.JWT_REFRESH_SECRET_KEY
+    return hmac.new(key.encode(), token.encode(), hashlib.sha256).hexdigest()
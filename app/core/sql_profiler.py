@@ -0,0 +1,170 @@
+"""
+Per-request SQL profile for development and tests (SQL_PROFILE_ENABLED).
+
+Every statement run through an instrumented engine (app.db.engine) while a
+request is in flight is recorded against its route, streamed bodies included.
+At the end of the request:
+
+- the same SQL text run SQL_PROFILE_REPEAT_THRESHOLD times or more is
+  flagged as a likely N+1;
+- statements slower than SQL_PROFILE_EXPLAIN_MS have their plan captured:
+  EXPLAIN (ANALYZE, BUFFERS) for SELECTs, plain EXPLAIN for writes, which
+  ANALYZE would run a second time;
+- the count is checked against the route's budget, declared with
+  @sql_budget(n) under the route decorator. Counted are statements sent to
+  the database, not BEGIN/COMMIT.
+
+Findings are logged; the test suite's plugin (tests/sql_budget.py) turns
+budget overruns into test failures.
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("sql_profile", default=None)
+
+
+def sql_budget(statements: int):
+    """Declare how many SQL statements a route may run per request."""
+    def decorator(endpoint):
+        endpoint.sql_budget = statements
+        return endpoint
+    return decorator
+
+
+@dataclass
+class Statement:
+    engine: str
+    sql: str
+    elapsed: float
+    executemany: bool
+    plan: list[str] | None = None
+
+
+@dataclass
+class RequestProfile:
+    route: str
+    statements: list[Statement] = field(default_factory=list)
+    budget: int | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return sum(s.elapsed for s in self.statements)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        counts = Counter(s.sql for s in self.statements)
+        return {sql: n for sql, n in counts.items() if n >= threshold}
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and len(self.statements) > self.budget
+
+
+class SQLProfiler:
+
+    def __init__(self, enabled: bool, repeat_threshold: int, explain_ms: float | None):
+        self.enabled = enabled
+        self.repeat_threshold = repeat_threshold
+        self.explain_ms = explain_ms
+        self.strict = False  # routes without a budget count as violations
+        self.violations: list[str] = []
+
+    @contextmanager
+    def profile(self, route: str = "unmatched"):
+        profile = RequestProfile(route)
+        token = _current.set(profile)
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+
+    def record(self, conn, cursor_sql: str, parameters, elapsed: float, engine: str, executemany: bool):
+        """Called by the engine hooks; a no-op outside a profiled request."""
+        profile = _current.get()
+        if profile is None:
+            return
+        statement = Statement(engine, cursor_sql, elapsed, executemany)
+        if self.explain_ms is not None and elapsed * 1000 >= self.explain_ms and not executemany:
+            statement.plan = self._explain(conn, cursor_sql, parameters)
+        profile.statements.append(statement)
+
+    @staticmethod
+    def _explain(conn, sql: str, parameters) -> list[str] | None:
+        operation = sql.lstrip()[:6].upper()
+        if operation == "SELECT":
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        elif operation in ("INSERT", "UPDATE", "DELETE"):
+            prefix = "EXPLAIN "
+        else:
+            return None
+        # own cursor, so the statement's pending result is left alone, and a
+        # savepoint, so a failed EXPLAIN cannot abort the request's transaction
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT sql_profiler_explain")
+            try:
+                cursor.execute(prefix + sql, parameters)
+                plan = [row[0] for row in cursor.fetchall()]
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+                logger.warning("EXPLAIN failed for %s", sql, exc_info=True)
+                return None
+            cursor.execute("RELEASE SAVEPOINT sql_profiler_explain")
+            return plan
+        finally:
+            cursor.close()
+
+    def finish(self, profile: RequestProfile):
+        logger.info("SQL %s: %d statements, %.1f ms", profile.route, len(profile.statements), profile.elapsed * 1000)
+        for sql, n in profile.repeated(self.repeat_threshold).items():
+            logger.warning("SQL %s: same statement run %d times (N+1?): %s", profile.route, n, sql)
+        for s in profile.statements:
+            if s.plan:
+                logger.warning("SQL %s: %.1f ms\n%s\n%s", profile.route, s.elapsed * 1000, s.sql, "\n".join(s.plan))
+
+        if profile.over_budget:
+            message = (f"{profile.route} ran {len(profile.statements)} SQL statements, budget is {profile.budget}:\n"
+                       + "\n".join(f"  {s.sql}" for s in profile.statements))
+        elif profile.budget is None and self.strict and profile.route != "unmatched":
+            message = f"{profile.route} has no @sql_budget"
+        else:
+            return
+        logger.warning(message)
+        self.violations.append(message)
+
+
+class SQLProfilerMiddleware:
+    """
+    Plain ASGI middleware rather than @app.middleware("http"): the profile has
+    to stay open until a streamed body is fully sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not sql_profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with sql_profiler.profile() as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    profile.route = f"{scope['method']} {route.path}"
+                profile.budget = getattr(scope.get("endpoint"), "sql_budget", None)
+                sql_profiler.finish(profile)
+
+
+sql_profiler = SQLProfiler(
+    enabled=settings.SQL_PROFILE_ENABLED,
+    repeat_threshold=settings.SQL_PROFILE_REPEAT_THRESHOLD,
+    explain_ms=settings.SQL_PROFILE_EXPLAIN_MS,
+)
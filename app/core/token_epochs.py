@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.events import TOKENS_REVOKED, USER_CHANGED, USER_DELETED, event_bus
+from app.models.user import User
+
+# Epoch used locally for deleted users; no token can ever carry it.
+REVOKED_EPOCH = sys.maxsize
+
+
+_EPOCH_COLUMNS = select(User.user_id, User.token_epoch, User.token_epoch_changed_at)
+_EPOCHS_ALL = _EPOCH_COLUMNS.where(User.token_epoch > 0)
+_EPOCHS_CHANGED_SINCE = _EPOCH_COLUMNS.where(
+    User.token_epoch_changed_at > bindparam("since", type_=User.token_epoch_changed_at.type)
+)
+_BUMP_EPOCH = (
+    update(User)
+    .where(User.user_id == bindparam("b_user_id"))  # b_: a column-named parameter would be taken as a SET value
+    .values(
+        token_epoch=User.token_epoch + 1,
+        token_epoch_changed_at=func.clock_timestamp(),
+        updated_at=User.updated_at,  # revoking tokens is not a change to the user (export's updated_since)
+    )
+    .returning(User.token_epoch)
+)
+
+
+class TokenEpochTable:
+    """
+    In-memory user_id -> token epoch map used by claims-mode auth.
+
+    Only users whose epoch was ever bumped are stored (everyone else is at 0),
+    and the table is refreshed incrementally from users.token_epoch_changed_at
+    at most once every TOKEN_EPOCH_REFRESH_SEC, separately for each shard.
+    """
+
+    def __init__(self, refresh_interval: float, overlap: float):
+        self.refresh_interval = refresh_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._epochs: dict[str, int] = {}
+        # per shard: each database has its own clock and change stream
+        self._high_water: dict[str, datetime] = {}
+        self._loaded: set[str] = set()
+        self._last_refresh: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def current(self, user_id) -> int:
+        return self._epochs.get(str(user_id), 0)
+
+    def record(self, user_id, epoch: int | None):
+        key = str(user_id)
+        if epoch is not None and epoch > self._epochs.get(key, 0):
+            self._epochs[key] = epoch
+
+    def forget(self, user_id):
+        """Mark a deleted user so every outstanding token is rejected."""
+        self._epochs[str(user_id)] = REVOKED_EPOCH
+
+    async def refresh(self, db: AsyncSession, shard: str = "default"):
+        high_water = self._high_water.get(shard)
+        if shard in self._loaded and high_water is not None:
+            # re-read a small window so rows committed slightly out of order are not missed
+            result = await db.execute(_EPOCHS_CHANGED_SINCE, {"since": high_water - self.overlap})
+        else:
+            result = await db.execute(_EPOCHS_ALL)
+        for user_id, epoch, changed_at in result:
+            self.record(user_id, epoch)
+            if changed_at and (high_water is None or changed_at > high_water):
+                high_water = changed_at
+
+        if high_water is not None:
+            self._high_water[shard] = high_water
+        self._loaded.add(shard)
+        self._last_refresh[shard] = time.monotonic()
+
+    async def maybe_refresh(self, db: AsyncSession, shard: str = "default"):
+        lock = self._locks[shard]
+        if shard not in self._loaded:
+            # until the first load an empty table would accept revoked tokens:
+            # wait for whoever is loading instead of skipping
+            async with lock:
+                if shard not in self._loaded:
+                    await self.refresh(db, shard)
+            return
+        if time.monotonic() - self._last_refresh.get(shard, 0.0) < self.refresh_interval or lock.locked():
+            return
+        async with lock:
+            await self.refresh(db, shard)
+
+
+async def bump_epoch(db: AsyncSession, user_id) -> int | None:
+    """
+    Invalidate every access token issued to the user so far.
+    Runs inside the caller's transaction; call token_epochs.record() after commit.
+    """
+    result = await db.execute(_BUMP_EPOCH, {"b_user_id": user_id})
+    return result.scalar_one_or_none()
+
+
+token_epochs = TokenEpochTable(
+    refresh_interval=settings.TOKEN_EPOCH_REFRESH_SEC,
+    overlap=settings.TOKEN_EPOCH_SYNC_OVERLAP_SEC,
+)
+
+
+def _on_epoch_event(event: dict):
+    if event.get("epoch") is not None:
+        token_epochs.record(event["user_id"], event["epoch"])
+
+
+async def _catch_up_epochs():
+    from app.db.shards import shard_router
+    for shard, factory in shard_router.sessionmakers().items():
+        if shard in token_epochs._loaded:
+            async with factory() as db:
+                await token_epochs.refresh(db, shard)  # incremental from the high-water mark
+
+
+event_bus.subscribe(USER_CHANGED, _on_epoch_event)
+event_bus.subscribe(TOKENS_REVOKED, _on_epoch_event)
+event_bus.subscribe(USER_DELETED, lambda event: token_epochs.forget(event["user_id"]))
+event_bus.on_catch_up(_catch_up_epochs)
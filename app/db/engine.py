@@ -1,13 +1,86 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_QUERIES, DB_QUERY_LATENCY, Gauge
+from app.core.sql_profiler import sql_profiler
 
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    future=True,
-    echo=False,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=1800,
-    pool_pre_ping=True,
-)
\ No newline at end of file
+_instrumented: dict[str, AsyncEngine] = {}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, engine=self._orig_logging_name or "primary")
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+    """Count and time every statement run through `engine`, and feed the SQL profiler."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip()[:8].split(None, 1)[0].upper() if statement.strip() else ""
+        if operation not in _SQL_OPERATIONS:
+            operation = "OTHER"
+        DB_QUERIES.inc(engine=name, operation=operation)
+        DB_QUERY_LATENCY.observe(elapsed, engine=name, operation=operation)
+        sql_profiler.record(conn, statement, parameters, elapsed, name, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    _instrumented[name] = engine
+
+
+def _pool_stat(stat: str) -> dict:
+    return {(name,): getattr(e.sync_engine.pool, stat)() for name, e in _instrumented.items()}
+
+
+Gauge("db_pool_in_use", "Connections currently checked out", ("engine",), callback=lambda: _pool_stat("checkedout"))
+Gauge("db_pool_overflow", "Connections open beyond pool_size (negative: unused capacity)", ("engine",), callback=lambda: _pool_stat("overflow"))
+Gauge("db_pool_size", "Configured pool size", ("engine",), callback=lambda: _pool_stat("size"))
+
+
+def make_engine(url: str, name: str, schema: str | None = None) -> AsyncEngine:
+    connect_args = {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if schema:
+        # schema-per-shard: every query, ORM or raw SQL, resolves tables there first
+        connect_args["server_settings"] = {"search_path": f'"{schema}", public'}
+    new_engine = create_async_engine(
+        url,
+        future=True,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # asyncpg prepares every statement; keep them per connection so the
+        # repositories' fixed SQL text skips the parse/plan round trip
+        connect_args=connect_args,
+    )
+    instrument_engine(new_engine, name)
+    return new_engine
+
+
+engine = make_engine(settings.DATABASE_URL, "primary")
+read_engine = make_engine(settings.DATABASE_READ_URL, "replica") if settings.DATABASE_READ_URL else None
@@ -0,0 +1,33 @@
+"""
+Run Alembic migrations on every shard.
+
+    python -m app.db.migrate_shards [revision] [-x key=value ...]
+
+The default shard uses alembic.ini's url as `alembic upgrade` does; each
+entry of DATABASE_SHARDS is migrated with `-x shard=<name>`, its schema
+created first when it has one. Other -x arguments (for instance
+partition_refresh_tokens=true) are passed on to every shard.
+"""
+import argparse
+from argparse import Namespace
+from alembic import command
+from alembic.config import Config
+from app.core.config import settings
+from app.db.shards import DEFAULT_SHARD
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("revision", nargs="?", default="head")
+    parser.add_argument("--config", default="alembic.ini")
+    parser.add_argument("-x", action="append", default=[], help="additional alembic -x argument, key=value")
+    args = parser.parse_args()
+
+    for name in [DEFAULT_SHARD, *settings.DATABASE_SHARDS]:
+        print(f"Migrating shard {name} to {args.revision}")
+        config = Config(args.config, cmd_opts=Namespace(x=[*args.x, f"shard={name}"]))
+        command.upgrade(config, args.revision)
+
+
+if __name__ == "__main__":
+    main()
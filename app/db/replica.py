@@ -0,0 +1,70 @@
+import logging
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.db.engine import read_engine
+from app.db.session import AsyncSessionLocal, AsyncReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 0 when the replica has replayed everything it received (an idle primary
+# would otherwise look like growing lag); NULL -> 0 when pointed at a primary
+LAG_SQL = text("""
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+""")
+
+
+class ReplicaHealth:
+    """
+    Decides whether reads may go to the replica. The lag probe runs at most
+    once per READ_REPLICA_CHECK_INTERVAL_SEC; until the next probe a failed or
+    lagging replica is skipped and reads fall back to the primary.
+    """
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.healthy = False
+        self.lag: float | None = None
+        self._checked_at = float("-inf")
+
+    async def check(self):
+        self._checked_at = time.monotonic()
+        try:
+            async with read_engine.connect() as conn:
+                self.lag = float(await conn.scalar(LAG_SQL))
+        except (OSError, DBAPIError):
+            logger.warning("Read replica unreachable, using primary", exc_info=True)
+            self.healthy = False
+            return
+        self.healthy = self.lag <= self.max_lag
+        if not self.healthy:
+            logger.warning("Read replica lag %.1fs over %.1fs, using primary", self.lag, self.max_lag)
+
+    def mark_down(self):
+        self.healthy = False
+        self._checked_at = time.monotonic()
+
+    async def usable(self) -> bool:
+        if read_engine is None:
+            return False
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            await self.check()
+        return self.healthy
+
+
+replica_health = ReplicaHealth(
+    max_lag=settings.READ_REPLICA_MAX_LAG_SEC,
+    check_interval=settings.READ_REPLICA_CHECK_INTERVAL_SEC,
+)
+
+
+async def read_sessionmaker():
+    """Replica session factory when it is usable, else the primary's."""
+    if await replica_health.usable():
+        return AsyncReadSessionLocal
+    return AsyncSessionLocal
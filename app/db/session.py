@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from app.db.engine import engine
+from app.db.engine import engine, read_engine
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -7,6 +7,13 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# None when no replica is configured; see app.db.replica for routing
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+) if read_engine is not None else None
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Tenant -> database shard routing.
+
+The "default" shard is DATABASE_URL (with its optional read replica). It also
+holds the tenant directory: the tenants table that /tenants/* and login by
+email alone read. Other shards come from DATABASE_SHARDS, each a separate
+DSN, a Postgres schema, or both; TENANT_SHARD_MAP assigns tenants to them.
+
+Moving a tenant: migrate the shard (python -m app.db.migrate_shards), copy
+the tenant's tenants row and its users/refresh_tokens there, then add it to
+TENANT_SHARD_MAP and roll the workers.
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from app.core.config import settings
+from app.db.engine import engine, make_engine
+from app.db.replica import read_sessionmaker
+from app.db.session import AsyncSessionLocal
+
+DEFAULT_SHARD = "default"
+
+
+class ShardRouter:
+
+    def __init__(self, shards: dict[str, dict[str, str]], tenant_map: dict[str, str]):
+        unknown = set(tenant_map.values()) - set(shards) - {DEFAULT_SHARD}
+        if unknown:
+            raise ValueError(f"TENANT_SHARD_MAP refers to unknown shards: {sorted(unknown)}")
+
+        self.tenant_map = tenant_map
+        self.specs = {DEFAULT_SHARD: {"url": settings.DATABASE_URL}}
+        self.engines: dict[str, AsyncEngine] = {DEFAULT_SHARD: engine}
+        self._sessionmakers = {DEFAULT_SHARD: AsyncSessionLocal}
+        for name, spec in shards.items():
+            spec = {"url": settings.DATABASE_URL, **spec}
+            self.specs[name] = spec
+            self.engines[name] = make_engine(spec["url"], f"shard_{name}", spec.get("schema"))
+            self._sessionmakers[name] = async_sessionmaker(
+                bind=self.engines[name], autoflush=False, expire_on_commit=False,
+            )
+
+    def shard_for(self, tenant_id) -> str:
+        if tenant_id is None:
+            return DEFAULT_SHARD
+        return self.tenant_map.get(str(tenant_id), DEFAULT_SHARD)
+
+    def sessionmaker(self, shard: str) -> async_sessionmaker:
+        return self._sessionmakers[shard]
+
+    def sessionmaker_for(self, tenant_id) -> async_sessionmaker:
+        return self._sessionmakers[self.shard_for(tenant_id)]
+
+    async def read_sessionmaker_for(self, tenant_id) -> async_sessionmaker:
+        """Only the default shard has a replica; other shards read from their primary."""
+        shard = self.shard_for(tenant_id)
+        if shard == DEFAULT_SHARD:
+            return await read_sessionmaker()
+        return self._sessionmakers[shard]
+
+    def sessionmakers(self) -> dict[str, async_sessionmaker]:
+        return dict(self._sessionmakers)
+
+    def urls(self) -> set[str]:
+        """Distinct database URLs; schema shards share their database's."""
+        return {spec["url"] for spec in self.specs.values()}
+
+    async def dispose(self):
+        for name, shard_engine in self.engines.items():
+            if name != DEFAULT_SHARD:
+                await shard_engine.dispose()
+
+
+shard_router = ShardRouter(settings.DATABASE_SHARDS, settings.TENANT_SHARD_MAP)
@@ -1,12 +1,81 @@
-from fastapi import FastAPI
-from app.api.routes import auth, users, tenants
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.routes import auth, users, tenants, well_known
+from app.core.config import settings
+from app.core.hashing import hashing_pool
+from app.core import metrics
+from app.core.events import event_bus
+from app.core.sql_profiler import SQLProfilerMiddleware, sql_budget
+from app.db.engine import engine, read_engine
+from app.db.shards import shard_router
+from app.services.audit_log import audit_log
+from app.services.token_reaper import token_reaper
+from app.services.warmup import warmup
 
-app = FastAPI()
 
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(users.router, prefix="/users", tags=["users"])
-app.include_router(tenants.router, prefix="/tenants", tags=["tenants"])
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await event_bus.start()
+    if settings.AUDIT_LOG_ENABLED:
+        audit_log.start()
+    if settings.WARMUP_ENABLED:
+        warmup.start()
+    else:
+        warmup.ready = True
+    if settings.TOKEN_REAPER_ENABLED:
+        token_reaper.start()
+    yield
+    await warmup.stop()
+    await event_bus.stop()
+    await token_reaper.stop()
+    await audit_log.stop()  # drains before the engines go away
+    hashing_pool.shutdown()
+    await shard_router.dispose()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(SQLProfilerMiddleware)  # passes straight through unless SQL_PROFILE_ENABLED
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route else "unmatched"  # templated path keeps label cardinality bounded
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=path)
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=path, status=status_code)
+
+
+app.include_router(auth.router)
+app.include_router(users.router)
+app.include_router(tenants.router)
+app.include_router(well_known.router)
 
 @app.get("/ping")
+@sql_budget(0)
 async def ping():
     return {"message": "pong"}
+
+@app.get("/ready")
+@sql_budget(0)
+async def ready():
+    """Readiness probe; /ping stays the liveness probe."""
+    if not warmup.ready:
+        return JSONResponse({"status": "warming up"}, status_code=503)
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+@sql_budget(0)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
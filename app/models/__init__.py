@@ -1,4 +1,5 @@
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
 from app.models.tenant import Tenant
-from app.models.security_token import SecurityToken
\ No newline at end of file
+from app.models.security_token import SecurityToken
+from app.models.audit_event import AuditEvent
\ No newline at end of file
@@ -0,0 +1,22 @@
+import uuid
+from sqlalchemy import Column, Index, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from app.db.base import Base
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    audit_event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_type = Column(String, nullable=False)
+    # no foreign keys: the trail has to outlive deleted users and tenants
+    tenant_id = Column(UUID(as_uuid=True), nullable=True)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    actor_id = Column(UUID(as_uuid=True), nullable=True)  # the admin behind a change to user_id
+    ip = Column(String, nullable=True)
+    detail = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # when it happened, not when it was flushed
+
+    __table_args__ = (
+        Index("ix_audit_events_tenant_id_created_at", "tenant_id", "created_at"),
+        Index("ix_audit_events_user_id_created_at", "user_id", "created_at"),
+    )
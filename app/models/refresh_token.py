@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Index, String, Boolean, DateTime, ForeignKey, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -8,11 +8,17 @@ class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
     refresh_token_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    token = Column(String, nullable=False, index=True)
+    token_digest = Column(String(64), nullable=False, unique=True, index=True)  # HMAC-SHA256 hex
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # shared by a login and its rotations
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id"), nullable=False, index=True)
     revoked = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=False)
 
+    __table_args__ = (
+        # only active tokens are ever looked up or revoked by user
+        Index("ix_refresh_tokens_user_id_active", "user_id", postgresql_where=text("revoked = false")),
+    )
+
     user = relationship("User", back_populates="refresh_tokens")
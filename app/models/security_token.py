@@ -9,7 +9,7 @@ class SecurityToken(Base):
     __tablename__ = "security_tokens"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id"), nullable=False, index=True)
     token_hash = Column(String, nullable=False)
     token_type = Column(String, nullable=False)  # e.g.: 'verify'
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, func
+from sqlalchemy import Column, Index, String, Boolean, DateTime, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import Base
@@ -12,4 +12,12 @@ class Tenant(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_tenants_created_at_tenant_id", "created_at", "tenant_id"),
+        # pg_trgm: serves ILIKE '%q%' and similarity (%) searches
+        Index("ix_tenants_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # serves case-insensitive prefix searches: lower(name) LIKE 'q%'
+        Index("ix_tenants_name_lower_pattern", func.lower(name).label("name_lower"), postgresql_ops={"name_lower": "text_pattern_ops"}),
+    )
+
     users = relationship("User", back_populates="tenant", cascade="all, delete-orphan")
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Index, String, Boolean, DateTime, ForeignKey, Integer, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import Base
@@ -14,7 +14,20 @@ class User(Base):
     role = Column(String, default="user")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    token_epoch = Column(Integer, nullable=False, default=0, server_default="0")
+    token_epoch_changed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_login_at = Column(DateTime(timezone=True), nullable=True)  # written behind by app.services.audit_log
+
+    __table_args__ = (
+        Index("ix_users_tenant_id_created_at_user_id", "tenant_id", "created_at", "user_id"),
+        Index("ix_users_tenant_id_updated_at_user_id", "tenant_id", "updated_at", "user_id"),
+        # registration relies on it: INSERT ... ON CONFLICT (tenant_id, email) DO NOTHING
+        Index("ix_users_tenant_id_email", "tenant_id", "email", unique=True),
+    )
 
     tenant = relationship("Tenant", back_populates="users")
-    refresh_tokens = relationship("RefreshToken", cascade="all, delete-orphan", back_populates="user")
-    security_tokens = relationship("SecurityToken", cascade="all, delete-orphan", back_populates="user")
+    # the database deletes both with the user (ON DELETE CASCADE): deleting a
+    # user does not load them first
+    refresh_tokens = relationship("RefreshToken", cascade="all, delete-orphan", back_populates="user", passive_deletes=True)
+    security_tokens = relationship("SecurityToken", cascade="all, delete-orphan", back_populates="user", passive_deletes=True)
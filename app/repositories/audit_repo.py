@@ -0,0 +1,33 @@
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.audit_event import AuditEvent
+from app.models.user import User
+
+_users = User.__table__
+# Core table rather than the entity, so a list of parameters is a plain
+# executemany instead of the ORM's bulk-by-primary-key UPDATE. updated_at is
+# kept as is: logging in is not a change to the user.
+_RECORD_LOGIN = (
+    update(_users)
+    .where(_users.c.user_id == bindparam("b_user_id"))
+    .values(
+        last_login_at=func.greatest(_users.c.last_login_at, bindparam("b_last_login_at", type_=_users.c.last_login_at.type)),
+        updated_at=_users.c.updated_at,
+    )
+)
+
+
+class AuditRepository:
+
+    @staticmethod
+    async def insert_many(db: AsyncSession, rows: list[dict]):
+        """One multi-row INSERT; the caller owns the transaction."""
+        await db.execute(insert(AuditEvent).values(rows))
+
+    @staticmethod
+    async def record_logins(db: AsyncSession, logins: dict):
+        """Move users' last_login_at forward: {user_id: datetime}. Never moves it back."""
+        if logins:
+            await db.execute(_RECORD_LOGIN, [
+                {"b_user_id": user_id, "b_last_login_at": at} for user_id, at in logins.items()
+            ])
@@ -0,0 +1,89 @@
+from functools import cache
+from sqlalchemy import Integer, String, bindparam, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import cursor_params, keyset
+from app.models.tenant import Tenant
+
+_BY_NAME = select(Tenant).where(Tenant.name == bindparam("name"))
+_CREATE = insert(Tenant).on_conflict_do_nothing(index_elements=[Tenant.name]).returning(Tenant)
+
+# Search patterns are escaped and wrapped in Python so the SQL text, and with
+# it the prepared statement, is the same for every query string.
+_SEARCH_LIMIT = bindparam("limit", type_=Integer)
+_SEARCH = {
+    "prefix": select(Tenant)
+    .where(func.lower(Tenant.name).like(bindparam("pattern", type_=String), escape="\\"))
+    .order_by(func.lower(Tenant.name))
+    .limit(_SEARCH_LIMIT),
+    "substring": select(Tenant)
+    .where(Tenant.name.ilike(bindparam("pattern", type_=String), escape="\\"))
+    .order_by(Tenant.name)
+    .limit(_SEARCH_LIMIT),
+}
+_SIMILARITY = func.similarity(Tenant.name, bindparam("q", type_=String)).label("score")
+_FUZZY = (
+    select(Tenant, _SIMILARITY)
+    .where(Tenant.name.op("%")(bindparam("q", type_=String)))
+    .order_by(_SIMILARITY.desc(), Tenant.name)
+    .limit(_SEARCH_LIMIT)
+)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@cache
+def _page_stmt(filtered: bool, after: bool, limited: bool):
+    stmt = select(Tenant)
+    if filtered:
+        stmt = stmt.where(Tenant.name.ilike(bindparam("pattern", type_=String), escape="\\"))
+    stmt = keyset(stmt, Tenant.created_at, Tenant.tenant_id, after)
+    return stmt.limit(bindparam("limit", type_=Integer)) if limited else stmt
+
+
+def _page_params(name: str | None, cursor: str | None) -> dict:
+    params = cursor_params(cursor)
+    if name:
+        params["pattern"] = f"%{_escape_like(name)}%"
+    return params
+
+
+class TenantRepository:
+
+    @staticmethod
+    async def get_by_name(db: AsyncSession, name: str):
+        result = await db.execute(_BY_NAME, {"name": name})
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create(db: AsyncSession, name: str):
+        """One INSERT ... RETURNING and the commit; None if the name is taken."""
+        result = await db.execute(_CREATE, [{"name": name}])
+        tenant = result.scalar_one_or_none()
+        await db.commit()
+        return tenant
+
+    @staticmethod
+    async def page(db: AsyncSession, name: str | None, cursor: str | None, limit: int) -> list[Tenant]:
+        """Fetches limit + 1 rows so the caller can tell whether there is a next page."""
+        params = {**_page_params(name, cursor), "limit": limit + 1}
+        result = await db.execute(_page_stmt(bool(name), bool(cursor), True), params)
+        return result.scalars().all()
+
+    @staticmethod
+    def stream_query(name: str | None, cursor: str | None):
+        """(statement, params) for streaming every tenant after `cursor`."""
+        return _page_stmt(bool(name), bool(cursor), False), _page_params(name, cursor)
+
+    @staticmethod
+    async def search(db: AsyncSession, q: str, mode: str, limit: int) -> list:
+        """Tenants for prefix/substring, (tenant, score) rows for fuzzy."""
+        if mode == "fuzzy":
+            result = await db.execute(_FUZZY, {"q": q, "limit": limit})
+            return result.all()
+        pattern = _escape_like(q.lower() if mode == "prefix" else q)
+        pattern = f"{pattern}%" if mode == "prefix" else f"%{pattern}%"
+        result = await db.execute(_SEARCH[mode], {"pattern": pattern, "limit": limit})
+        return result.scalars().all()
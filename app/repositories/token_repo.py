@@ -1,17 +1,60 @@
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import insert, select, update
+from sqlalchemy import bindparam, select, update, func
 from datetime import datetime, timezone, timedelta
 from app.core.security import settings
 from app.models.refresh_token import RefreshToken
 
+_BY_DIGEST = select(RefreshToken).where(RefreshToken.token_digest == bindparam("token_digest"))
+_VALID = select(RefreshToken).where(
+    RefreshToken.user_id == bindparam("user_id"),
+    RefreshToken.token_digest == bindparam("token_digest"),
+    RefreshToken.revoked.is_(False),
+    RefreshToken.expires_at > func.now(),
+)
+
+# Marks a live token used and hands back what the replacement needs, so a
+# token can only be rotated once even under concurrent refreshes. UPDATE
+# parameters named like a column are taken as SET values, hence b_ names.
+_ROTATE = (
+    update(RefreshToken)
+    .where(
+        RefreshToken.token_digest == bindparam("b_token_digest"),
+        RefreshToken.revoked.is_(False),
+        RefreshToken.expires_at > func.now(),
+    )
+    .values(revoked=True)
+    .returning(RefreshToken.user_id, RefreshToken.tenant_id, RefreshToken.family_id)
+    .execution_options(synchronize_session=False)
+)
+
+
+def _revoke_stmt(*criteria):
+    return (
+        update(RefreshToken)
+        .where(*criteria, RefreshToken.revoked.is_(False))
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+_REVOKE_USER = _revoke_stmt(RefreshToken.user_id == bindparam("b_user_id"))
+_REVOKE_USER_IN_TENANT = _revoke_stmt(
+    RefreshToken.user_id == bindparam("b_user_id"),
+    RefreshToken.tenant_id == bindparam("b_tenant_id"),
+)
+_REVOKE_TENANT = _revoke_stmt(RefreshToken.tenant_id == bindparam("b_tenant_id"))
+_REVOKE_FAMILY = _revoke_stmt(RefreshToken.family_id == bindparam("b_family_id"))
+
 class TokenRepository:
 
     @staticmethod
-    async def save_refresh_token(db: AsyncSession, user_id, tenant_id, token_hash: str):
+    async def save_refresh_token(db: AsyncSession, user_id, tenant_id, token_digest: str, family_id=None):
         obj = RefreshToken(
-            token=token_hash,
+            token_digest=token_digest,
             user_id=user_id,
             tenant_id=tenant_id,
+            family_id=family_id or uuid.uuid4(),  # rotations stay in the login's family
             expires_at=datetime.now(timezone.utc) + timedelta(
                 minutes=settings.REFRESH_TOKEN_EXPIRE_MIN
             ),
@@ -20,19 +63,46 @@ class TokenRepository:
         return obj
 
     @staticmethod
-    async def get_valid_token(db: AsyncSession, user_id, token_hash):
-        stmt = select(RefreshToken).where(
-            RefreshToken.user_id == user_id,
-            RefreshToken.revoked.is_(None)
-        )
-        result = await db.execute(stmt)
+    async def get_by_digest(db: AsyncSession, token_digest: str):
+        result = await db.execute(_BY_DIGEST, {"token_digest": token_digest})
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_valid_token(db: AsyncSession, user_id, token_digest: str):
+        result = await db.execute(_VALID, {"user_id": user_id, "token_digest": token_digest})
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def revoke_all(db: AsyncSession, user_id):
-        stmt = update(RefreshToken).where(
-            RefreshToken.user_id == user_id,
-            RefreshToken.revoked.is_(None)
-        ).values(revoked=datetime.utcnow())
-        await db.execute(stmt)
+    async def rotate(db: AsyncSession, token_digest: str):
+        """(user_id, tenant_id, family_id) of the revoked token, or None if it was not live."""
+        result = await db.execute(_ROTATE, {"b_token_digest": token_digest})
+        return result.one_or_none()
+
+    # -------------------------
+    # Set-based revocation: one UPDATE, returns the number of tokens revoked.
+    # The caller owns the transaction.
+    # -------------------------
+    @staticmethod
+    async def _revoke(db: AsyncSession, stmt, params: dict) -> int:
+        result = await db.execute(stmt, params)
+        return result.rowcount
+
+    @staticmethod
+    async def revoke_for_user(db: AsyncSession, user_id, tenant_id=None) -> int:
+        if tenant_id is not None:
+            return await TokenRepository._revoke(db, _REVOKE_USER_IN_TENANT, {"b_user_id": user_id, "b_tenant_id": tenant_id})
+        return await TokenRepository._revoke(db, _REVOKE_USER, {"b_user_id": user_id})
+
+    @staticmethod
+    async def revoke_for_tenant(db: AsyncSession, tenant_id) -> int:
+        return await TokenRepository._revoke(db, _REVOKE_TENANT, {"b_tenant_id": tenant_id})
+
+    @staticmethod
+    async def revoke_family(db: AsyncSession, family_id) -> int:
+        return await TokenRepository._revoke(db, _REVOKE_FAMILY, {"b_family_id": family_id})
+
+    @staticmethod
+    async def revoke_all(db: AsyncSession, user_id) -> int:
+        count = await TokenRepository.revoke_for_user(db, user_id)
         await db.commit()
+        return count
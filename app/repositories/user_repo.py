@@ -1,26 +1,124 @@
-from sqlalchemy import select
+from functools import cache
+from sqlalchemy import Integer, any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import cursor_params, keyset
 from app.models.user import User
 
+# Statements are built once with bind parameters. SQLAlchemy memoizes their
+# cache key, so each execution goes straight to the compiled-SQL cache and
+# asyncpg's prepared statement cache instead of rebuilding the expression.
+_BY_ID = select(User).where(User.user_id == bindparam("user_id"))
+# one array parameter: the same prepared statement whatever the number of ids
+_BY_IDS = select(User).where(User.user_id == any_(bindparam("user_ids", type_=ARRAY(UUID(as_uuid=True)))))
+_BY_ID_IN_TENANT = select(User).where(
+    User.user_id == bindparam("user_id"),
+    User.tenant_id == bindparam("tenant_id"),
+)
+_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_BY_EMAIL_IN_TENANT = select(User).where(
+    User.email == bindparam("email"),
+    User.tenant_id == bindparam("tenant_id"),
+)
+_EXISTING_EMAILS = select(User.email).where(
+    User.tenant_id == bindparam("tenant_id"),
+    User.email.in_(bindparam("emails", expanding=True)),
+)
+_SET_PASSWORD_HASH = (
+    update(User)
+    .where(User.user_id == bindparam("b_user_id"))  # b_: a column-named parameter would be taken as a SET value
+    # a re-hash of the same password is not a change to the user (export's updated_since)
+    .values(hashed_password=bindparam("b_hashed_password"), updated_at=User.updated_at)
+    .execution_options(synchronize_session=False)
+)
+
+# (tenant_id, email) is unique: a clash inserts nothing and returns no row
+_INSERT = insert(User).on_conflict_do_nothing(index_elements=[User.tenant_id, User.email])
+_CREATE = _INSERT.returning(User)
+_INSERT_MANY = _INSERT.returning(User.email)
+
+
+@cache
+def _page_stmt(after: bool, limited: bool):
+    stmt = keyset(select(User).where(User.tenant_id == bindparam("tenant_id")), User.created_at, User.user_id, after)
+    return stmt.limit(bindparam("limit", type_=Integer)) if limited else stmt
+
+
+@cache
+def _export_stmt(since: bool):
+    stmt = select(User).where(User.tenant_id == bindparam("tenant_id"))
+    if since:
+        stmt = stmt.where(User.updated_at >= bindparam("updated_since", type_=User.updated_at.type))
+    return stmt.order_by(User.updated_at, User.user_id)
+
+
 class UserRepository:
-    def __init__(self, db: AsyncSession):
-        self.db = db
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id):
+        result = await db.execute(_BY_ID, {"user_id": user_id})
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_many(db: AsyncSession, user_ids: list) -> list[User]:
+        result = await db.execute(_BY_IDS, {"user_ids": user_ids})
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_in_tenant(db: AsyncSession, user_id, tenant_id):
+        result = await db.execute(_BY_ID_IN_TENANT, {"user_id": user_id, "tenant_id": tenant_id})
+        return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_email(db: AsyncSession, email: str):
-        stmt = select(User).where(User.email == email)
-        result = await db.execute(stmt)
+        result = await db.execute(_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
-    @staticmethod    
-    async def create(db: AsyncSession, email: str, hashed_password: str):
-        user = User(email=email, hashed_password=hashed_password)
-        db.add(user)
+    @staticmethod
+    async def get_by_email_in_tenant(db: AsyncSession, email: str, tenant_id):
+        result = await db.execute(_BY_EMAIL_IN_TENANT, {"email": email, "tenant_id": tenant_id})
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def existing_emails(db: AsyncSession, tenant_id, emails: list[str]) -> set[str]:
+        result = await db.execute(_EXISTING_EMAILS, {"tenant_id": tenant_id, "emails": emails})
+        return set(result.scalars())
+
+    @staticmethod
+    async def page(db: AsyncSession, tenant_id, cursor: str | None, limit: int) -> list[User]:
+        """Fetches limit + 1 rows so the caller can tell whether there is a next page."""
+        params = {"tenant_id": tenant_id, "limit": limit + 1, **cursor_params(cursor)}
+        result = await db.execute(_page_stmt(bool(cursor), True), params)
+        return result.scalars().all()
+
+    @staticmethod
+    def stream_query(tenant_id, cursor: str | None):
+        """(statement, params) for streaming every user after `cursor`."""
+        return _page_stmt(bool(cursor), False), {"tenant_id": tenant_id, **cursor_params(cursor)}
+
+    @staticmethod
+    def export_query(tenant_id, updated_since=None):
+        params = {"tenant_id": tenant_id}
+        if updated_since:
+            params["updated_since"] = updated_since
+        return _export_stmt(updated_since is not None), params
+
+    @staticmethod
+    async def create(db: AsyncSession, email: str, hashed_password: str, tenant_id, role: str = "user"):
+        """One INSERT ... RETURNING and the commit; None if the email is taken in the tenant."""
+        values = {"email": email, "hashed_password": hashed_password, "tenant_id": tenant_id, "role": role}
+        result = await db.execute(_CREATE, [values])
+        user = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(user)
         return user
 
-    async def get_by_id(self, user_id: int):
-        stmt = select(User).where(User.user_id == user_id)
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+    @staticmethod
+    async def set_password_hash(db: AsyncSession, user_id, hashed_password: str):
+        """Store a re-hash of the same password; the caller owns the transaction."""
+        await db.execute(_SET_PASSWORD_HASH, {"b_user_id": user_id, "b_hashed_password": hashed_password})
+
+    @staticmethod
+    async def insert_many(db: AsyncSession, values: list[dict]) -> set[str]:
+        """Batched multi-row INSERT; returns the emails actually inserted."""
+        result = await db.execute(_INSERT_MANY, values)
+        return set(result.scalars())
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from app.core.config import settings
 from uuid import UUID
 
 class Token(BaseModel):
@@ -9,3 +10,15 @@ class Token(BaseModel):
 class Login(BaseModel):
     email: EmailStr
     password: str
+    tenant_id: UUID | None = None  # required on a dedicated shard or for an email registered in several tenants
+
+class IntrospectRequest(BaseModel):
+    tokens: list[str] = Field(..., min_length=1, max_length=settings.INTROSPECT_MAX_TOKENS)
+
+class CurrentUser(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(validation_alias="user_id")
+    email: str
+    role: str
+    tenant_id: UUID
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr
 from uuid import UUID
 
 class UserCreate(BaseModel):
@@ -12,5 +13,12 @@ class UserOut(BaseModel):
     role: str
     tenant_id: UUID
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TenantOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    tenant_id: UUID
+    name: str
+    is_active: bool
+    created_at: datetime
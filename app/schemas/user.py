@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from uuid import UUID
 
 class UserCreate(BaseModel):
@@ -6,10 +7,20 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
 
-class UserOut(BaseModel):
-    user_id: UUID
+class UserImportRow(BaseModel):
     email: EmailStr
+    password: str = Field(..., min_length=1)
+    role: str = "user"
+
+# Response models read straight from ORM rows. Emails are plain str here:
+# they were validated on the way in, and EmailStr would re-check every row.
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(validation_alias="user_id")
+    email: str
     role: str
+    is_active: bool
 
-    class Config:
-        from_attributes = True
+class UserRow(UserOut):
+    created_at: datetime
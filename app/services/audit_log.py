@@ -0,0 +1,160 @@
+"""
+Write-behind audit trail: logins, failed logins, refreshes, logouts and admin
+changes to users, plus users.last_login_at.
+
+record() only puts the event on a bounded in-process queue; a background task
+writes it with one multi-row INSERT per shard every AUDIT_FLUSH_INTERVAL_MS or
+AUDIT_BATCH_SIZE events, whichever comes first, and moves last_login_at
+forward in the same transaction. stop() drains the queue on shutdown.
+
+When the queue is full, AUDIT_OVERFLOW_POLICY "drop" discards the event
+(audit_events_dropped_total) and "block" makes the request wait for room.
+A batch whose write fails is logged and dropped too: the trail is
+best-effort, the requests it describes have already been answered.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+from app.db.shards import shard_router
+from app.repositories.audit_repo import AuditRepository
+
+logger = logging.getLogger(__name__)
+
+LOGIN = "login"
+LOGIN_FAILED = "login.failed"
+TOKEN_REFRESHED = "token.refreshed"
+LOGOUT = "logout"
+USER_UPDATED = "user.updated"
+USER_PASSWORD_RESET = "user.password_reset"
+USER_DELETED = "user.deleted"
+
+AUDIT_DROPPED = Counter("audit_events_dropped_total", "Audit events never written", ("reason",))
+
+_STOP = object()
+
+
+class AuditLog:
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float, overflow: str, drain_timeout: float):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown audit overflow policy: {overflow!r}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def record(self, event_type: str, *, tenant_id=None, user_id=None, actor_id=None,
+                     ip: str | None = None, **detail):
+        if self._task is None:  # not started, or already draining
+            return
+        detail = {k: v for k, v in detail.items() if v is not None}
+        event = {
+            "audit_event_id": uuid.uuid4(),
+            "event_type": event_type,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "ip": ip,
+            "detail": detail or None,
+            "created_at": datetime.now(timezone.utc),
+        }
+        if self.overflow == "block":
+            await self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            AUDIT_DROPPED.inc(reason="queue_full")
+
+    async def _next_batch(self) -> list:
+        """Wait for one event, then collect more until batch_size or flush_interval is reached."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def write(self, events: list[dict]):
+        by_shard = defaultdict(list)
+        for event in events:
+            by_shard[shard_router.shard_for(event["tenant_id"])].append(event)
+
+        for shard, rows in by_shard.items():
+            logins = {}
+            for row in rows:
+                if row["event_type"] == LOGIN:
+                    logins[row["user_id"]] = max(row["created_at"], logins.get(row["user_id"], row["created_at"]))
+            try:
+                async with shard_router.sessionmaker(shard)() as db:
+                    await AuditRepository.insert_many(db, rows)
+                    await AuditRepository.record_logins(db, logins)
+                    await db.commit()
+            except Exception:  # anything escaping would end run(), and with "block" stall record()
+                AUDIT_DROPPED.inc(len(rows), reason="write_failed")
+                logger.warning("Dropped %d audit events for shard %s", len(rows), shard, exc_info=True)
+
+    async def run(self):
+        while True:
+            batch = await self._next_batch()
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                await self.write(batch)
+            if stopping:
+                return
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Flush everything recorded so far, giving up after drain_timeout."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None  # record() drops from here on
+
+        async def drain():
+            await self._queue.put(_STOP)  # inside the timeout: the queue may be full
+            await task
+
+        try:
+            await asyncio.wait_for(drain(), self.drain_timeout)
+        except TimeoutError:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            AUDIT_DROPPED.inc(self.depth, reason="shutdown")
+            logger.warning("Audit log drain timed out, %d events dropped", self.depth)
+
+
+audit_log = AuditLog(
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+    overflow=settings.AUDIT_OVERFLOW_POLICY,
+    drain_timeout=settings.AUDIT_DRAIN_TIMEOUT_SEC,
+)
+
+Gauge("audit_queue_depth", "Audit events waiting to be written", callback=lambda: audit_log.depth)
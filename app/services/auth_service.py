@@ -1,24 +1,26 @@
 from fastapi import HTTPException
 from app.repositories.user_repo import UserRepository
 from app.repositories.token_repo import TokenRepository
-from app.core.security import verify_password, hash_password, hash_token
-from app.core.jwt_manager import create_access_token, create_refresh_token
+from app.core.hashing import verify_and_update, hash_password
+from app.core.security import token_digest
+from app.core.rate_limit import rate_limiter
+from app.core.jwt_manager import create_access_token, create_refresh_token, user_claims
 from app.models.refresh_token import RefreshToken
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.services.audit_log import LOGIN, LOGIN_FAILED, audit_log
 from uuid import UUID
+from sqlalchemy.exc import MultipleResultsFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class AuthService:
 
     @staticmethod
-    async def register_user(db: AsyncSession, email: str, password: str):
-        existing = await UserRepository.get_by_email(db, email)
-        if existing:
+    async def register_user(db: AsyncSession, email: str, password: str, tenant_id: UUID):
+        hashed = await hash_password(password)
+        user = await UserRepository.create(db, email, hashed, tenant_id)
+        if user is None:
             raise HTTPException(status_code=400, detail="Email already registered")
-
-        hashed = hash_password(password)
-        user = await UserRepository.create(db, email, hashed)
         return user
             # Print for debugging
 
@@ -26,50 +28,75 @@ class AuthService:
     async def store_refresh_token(
         db: AsyncSession,
         user_id: UUID,
-        refresh_hash: str
+        tenant_id: UUID,
+        refresh_token: str
     ):
         new_token = await TokenRepository.save_refresh_token(
             db,
             user_id=user_id,
-            token_hash=refresh_hash
+            tenant_id=tenant_id,
+            token_digest=token_digest(refresh_token)
         )
 
         await db.commit()
-        await db.refresh(new_token)  # optional
 
         return new_token
 
     @staticmethod
-    async def login(db: AsyncSession, email: str, password: str):
-        # 1. Fetch user
-        user = await UserRepository.get_by_email(db, email)
+    async def login(db: AsyncSession, email: str, password: str, client_ip: str | None = None, tenant_id: UUID | None = None):
+        # 1. Fetch user, within the tenant when one is given: emails are only unique per tenant
+        if tenant_id is not None:
+            user = await UserRepository.get_by_email_in_tenant(db, email, tenant_id)
+        else:
+            try:
+                user = await UserRepository.get_by_email(db, email)
+            except MultipleResultsFound:
+                raise HTTPException(status_code=400, detail="tenant_id is required for this email")
         if not user:
+            await audit_log.record(LOGIN_FAILED, ip=client_ip, email=email.lower(), reason="unknown_email")
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
+        # The user's tenant limits, now that it is known; still ahead of the hash
+        for name, key in (("login_ip", client_ip), ("login_email", email.lower())):
+            if key:
+                await rate_limiter.check(name, f"{user.tenant_id}:{key}", rate_limiter.limit(name, user.tenant_id))
+
         # 2. Verify password
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update(password, user.hashed_password)
+        if not valid or not user.is_active:
+            await audit_log.record(
+                LOGIN_FAILED, tenant_id=user.tenant_id, user_id=user.user_id, ip=client_ip,
+                reason="bad_password" if not valid else "inactive",
+            )
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid credentials")
+        if not user.is_active:
+            raise HTTPException(status_code=401, detail="Inactive user")
 
         # 3. Issue tokens
-        access_token = create_access_token(str(user.user_id))
-        refresh_token = create_refresh_token(str(user.user_id))
-        hashed_refresh_token = hash_token(refresh_token)
+        access_token = create_access_token(str(user.user_id), user_claims(user))
+        refresh_token = create_refresh_token(str(user.user_id), user.tenant_id)
 
-        # 4. Persist hashed refresh token
-        refresh_token_obj = await TokenRepository.save_refresh_token(
+        # 4. Persist refresh token digest
+        await TokenRepository.save_refresh_token(
             db=db,
             user_id=user.user_id,
             tenant_id=user.tenant_id,
-            token_hash=hashed_refresh_token,
+            token_digest=token_digest(refresh_token),
         )
 
+        # Stored hash uses outdated argon2 parameters: upgrade it in the same commit
+        if new_hash:
+            await UserRepository.set_password_hash(db, user.user_id, new_hash)
+
         # 5. Commit transaction
         try:
             await db.commit()
-            await db.refresh(refresh_token_obj)
         except Exception:
             await db.rollback()
             raise
 
+        # last_login_at is set from this event when the audit log flushes
+        await audit_log.record(LOGIN, tenant_id=user.tenant_id, user_id=user.user_id, ip=client_ip)
         return access_token, refresh_token, user
 
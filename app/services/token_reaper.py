@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select, or_, and_, func, text
+from app.core.config import settings
+from app.db.shards import shard_router
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenReaper:
+    """
+    Background task that deletes expired refresh tokens, and revoked ones once
+    they are past the reuse-detection window, in small batches.
+    If refresh_tokens is range-partitioned by expires_at it also keeps future
+    monthly partitions created and drops partitions that are entirely expired.
+    """
+
+    def __init__(self, batch_size: int, interval: float, lock_timeout_ms: int, revoked_retention_min: int):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lock_timeout_ms = lock_timeout_ms
+        self.revoked_retention_min = revoked_retention_min
+        self._task: asyncio.Task | None = None
+        self._batch = self._batch_stmt()  # built once, reused for every batch
+
+    def _batch_stmt(self):
+        revoked_cutoff = func.now() - timedelta(minutes=self.revoked_retention_min)
+        victims = (
+            select(RefreshToken.refresh_token_id)
+            .where(or_(
+                RefreshToken.expires_at < func.now(),
+                and_(RefreshToken.revoked.is_(True), RefreshToken.created_at < revoked_cutoff),
+            ))
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return delete(RefreshToken).where(RefreshToken.refresh_token_id.in_(victims.scalar_subquery()))
+
+    async def reap_once(self, sessionmaker) -> int:
+        """Delete batches until one comes back short; returns rows deleted."""
+        total = 0
+        while True:
+            async with sessionmaker() as db:
+                await db.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+                result = await db.execute(self._batch)
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+            await asyncio.sleep(0)  # let request handlers in between batches
+
+    async def maintain_partitions(self, sessionmaker):
+        async with sessionmaker() as db:
+            partitioned = await db.scalar(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'refresh_tokens'::regclass)"
+            ))
+            if not partitioned:
+                return
+
+            await db.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+            now = datetime.now(timezone.utc)
+            for offset in range(settings.TOKEN_PARTITION_MONTHS_AHEAD + 1):
+                start = _add_months(now, offset)
+                end = _add_months(now, offset + 1)
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS refresh_tokens_p{start:%Y%m} PARTITION OF refresh_tokens "
+                    f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+                ))
+
+            result = await db.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass AND c.relname ~ '^refresh_tokens_p[0-9]{6}$'"
+            ))
+            current = f"{now:%Y%m}"
+            for (name,) in result:
+                if name[-6:] < current:  # the whole month has expired
+                    await db.execute(text(f"DROP TABLE {name}"))
+                    logger.info("Dropped expired partition %s", name)
+            await db.commit()
+
+    async def run(self):
+        while True:
+            for shard, sessionmaker in shard_router.sessionmakers().items():
+                # separately, so a failing partition job does not stop reaping;
+                # any error (lock timeout, pool timeout, bug) is retried next
+                # round rather than ending the task
+                try:
+                    await self.maintain_partitions(sessionmaker)
+                except Exception:
+                    logger.warning("Refresh token partition maintenance failed on shard %s", shard, exc_info=True)
+                try:
+                    deleted = await self.reap_once(sessionmaker)
+                    if deleted:
+                        logger.info("Reaped %d refresh tokens on shard %s", deleted, shard)
+                except Exception:
+                    logger.warning("Refresh token reaper run failed on shard %s", shard, exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    month = dt.month - 1 + months
+    return dt.replace(year=dt.year + month // 12, month=month % 12 + 1, day=1,
+                      hour=0, minute=0, second=0, microsecond=0)
+
+
+token_reaper = TokenReaper(
+    batch_size=settings.TOKEN_REAPER_BATCH_SIZE,
+    interval=settings.TOKEN_REAPER_INTERVAL_SEC,
+    lock_timeout_ms=settings.TOKEN_REAPER_LOCK_TIMEOUT_MS,
+    revoked_retention_min=settings.TOKEN_REAPER_REVOKED_RETENTION_MIN,
+)
@@ -0,0 +1,124 @@
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.hashing import hash_passwords
+from app.repositories.user_repo import UserRepository
+from app.schemas.user import UserImportRow
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()  # chunks may split a character
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+class UserImportService:
+
+    @staticmethod
+    async def iter_rows(request: Request) -> AsyncIterator[dict | str]:
+        """
+        Parse the body as it arrives. CSV needs a header line; anything else is
+        read as NDJSON. Unparseable lines are yielded as an error string.
+        """
+        is_csv = request.headers.get("content-type", "").startswith("text/csv")
+        header = None
+        async for line in _iter_lines(request):
+            if is_csv:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [h.strip() for h in values]
+                    continue
+                yield dict(zip(header, values))
+            else:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield "Invalid JSON"
+
+    @staticmethod
+    async def import_batch(db: AsyncSession, tenant_id, batch: list[tuple[int, dict | str]]) -> list[dict]:
+        report = {}
+        valid: dict[str, tuple[int, UserImportRow]] = {}
+
+        for row_no, raw in batch:
+            if isinstance(raw, str):
+                report[row_no] = {"row": row_no, "status": "invalid", "error": raw}
+                continue
+            try:
+                row = UserImportRow.model_validate(raw)
+            except ValidationError as e:
+                report[row_no] = {"row": row_no, "email": raw.get("email") if isinstance(raw, dict) else None,
+                                  "status": "invalid", "error": e.errors(include_url=False, include_input=False)}
+                continue
+            if row.email in valid:
+                report[row_no] = {"row": row_no, "email": row.email, "status": "duplicate"}
+                continue
+            valid[row.email] = (row_no, row)
+
+        # one set-based query for emails that already exist in the tenant
+        if valid:
+            existing = await UserRepository.existing_emails(db, tenant_id, list(valid))
+            for email in existing:
+                row_no, _ = valid.pop(email)
+                report[row_no] = {"row": row_no, "email": email, "status": "duplicate"}
+
+        if valid:
+            rows = list(valid.values())
+            hashes = await hash_passwords([row.password for _, row in rows])
+            values = []
+            for (row_no, row), hashed in zip(rows, hashes):
+                user_id = uuid.uuid4()
+                values.append({
+                    "user_id": user_id,
+                    "tenant_id": tenant_id,
+                    "email": row.email,
+                    "hashed_password": hashed,
+                    "role": row.role,
+                    "is_active": True,
+                })
+                report[row_no] = {"row": row_no, "email": row.email, "status": "created", "user_id": str(user_id)}
+            inserted = await UserRepository.insert_many(db, values)
+            await db.commit()
+            # rows that lost a race with a concurrent insert were skipped by ON CONFLICT
+            for row_no, row in rows:
+                if row.email not in inserted:
+                    report[row_no] = {"row": row_no, "email": row.email, "status": "duplicate"}
+
+        return [report[row_no] for row_no, _ in batch]
+
+    @staticmethod
+    async def import_users(db: AsyncSession, tenant_id, rows: AsyncIterator[dict | str]) -> dict:
+        results = []
+        batch = []
+        row_no = 0
+        truncated = False
+        async for raw in rows:
+            row_no += 1
+            if row_no > settings.BULK_IMPORT_MAX_ROWS:
+                # earlier batches are already committed; report what was done
+                truncated = True
+                break
+            batch.append((row_no, raw))
+            if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+                results += await UserImportService.import_batch(db, tenant_id, batch)
+                batch = []
+        if batch:
+            results += await UserImportService.import_batch(db, tenant_id, batch)
+
+        summary = {"created": 0, "duplicate": 0, "invalid": 0}
+        for r in results:
+            summary[r["status"]] += 1
+        return {"summary": summary, "truncated": truncated, "rows": results}
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import uuid
+from contextlib import AsyncExitStack
+from sqlalchemy.orm import configure_mappers
+from app.core.config import settings
+from app.core.hashing import hash_password, hashing_pool, verify_password
+from app.core.jwt_manager import create_access_token, decode_access_token
+from app.db.session import AsyncReadSessionLocal
+from app.db.shards import shard_router
+from app.repositories.tenant_repo import TenantRepository
+from app.repositories.token_repo import TokenRepository
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_statements(db):
+    """Run the hot lookups once (matching nothing) to compile and prepare them on this connection."""
+    await UserRepository.get_by_id(db, uuid.uuid4())
+    await UserRepository.get_many(db, [uuid.uuid4()])
+    await UserRepository.get_by_email(db, "warmup@invalid")
+    await UserRepository.get_by_email_in_tenant(db, "warmup@invalid", uuid.uuid4())
+    await TokenRepository.get_by_digest(db, "0" * 64)
+    await TenantRepository.page(db, None, None, 1)
+
+
+class Warmup:
+    """
+    Pays the first-request costs before /ready reports ready: mapper
+    configuration, `connections` pooled connections per engine with the hot
+    statements prepared on each, argon2 workers and the JWT backend.
+    Retries every `retry_interval` until the database is reachable.
+    """
+
+    def __init__(self, connections: int, retry_interval: float):
+        self.connections = connections
+        self.retry_interval = retry_interval
+        self.ready = False
+        self._task: asyncio.Task | None = None
+
+    async def fill_pool(self, sessionmaker):
+        # hold every session at once so each gets its own connection
+        async with AsyncExitStack() as stack:
+            sessions = [await stack.enter_async_context(sessionmaker()) for _ in range(self.connections)]
+            await asyncio.gather(*(_warm_statements(db) for db in sessions))
+
+    async def run_once(self):
+        configure_mappers()
+        decode_access_token(create_access_token(str(uuid.uuid4())))
+
+        # one job per worker starts every process in the pool
+        hashed = await hash_password("warm-up")
+        await asyncio.gather(*(verify_password("warm-up", hashed) for _ in range(hashing_pool.size)))
+
+        for sessionmaker in shard_router.sessionmakers().values():
+            await self.fill_pool(sessionmaker)
+        if AsyncReadSessionLocal is not None:
+            await self.fill_pool(AsyncReadSessionLocal)
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                # database down, pool timeout, hashing pool busy (503), ...:
+                # giving up would leave /ready at 503 for good
+                logger.warning("Warm-up failed, retrying in %.0fs", self.retry_interval, exc_info=True)
+                await asyncio.sleep(self.retry_interval)
+                continue
+            self.ready = True
+            logger.info("Warm-up done")
+            return
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+warmup = Warmup(
+    connections=min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE),
+    retry_interval=settings.WARMUP_RETRY_SEC,
+)
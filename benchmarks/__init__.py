@@ -0,0 +1,8 @@
+"""
+Benchmarks for the auth service.
+
+    uv run python -m benchmarks micro
+    uv run python -m benchmarks load --concurrency 32 --duration 20
+
+Both print a JSON report (or write it with --out) so runs can be diffed.
+"""
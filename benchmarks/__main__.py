@@ -0,0 +1,54 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    micro = sub.add_parser("micro", help="argon2 / JWT / digest microbenchmarks")
+    micro.add_argument("--iterations", type=int, default=200)
+
+    load = sub.add_parser(
+        "load",
+        help="end-to-end load test; seeds a throwaway tenant in DATABASE_URL, so point it at a disposable database",
+    )
+    load.add_argument("--concurrency", type=int, default=16)
+    load.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    load.add_argument("--scenario", action="append", dest="scenarios",
+                      help="repeatable; default: all of them")
+    load.add_argument("--url", help="benchmark an already running server instead of starting one")
+    load.add_argument("--port", type=int, default=8765)
+    load.add_argument("--workers", type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "micro":
+        from benchmarks import micro as bench
+        results = bench.run(args.iterations)
+    else:
+        from benchmarks import load as bench
+        scenarios = args.scenarios or bench.SCENARIOS
+        results = bench.run(args.concurrency, args.duration, scenarios, args.url, args.port, args.workers)
+
+    report = {
+        "benchmark": args.command,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
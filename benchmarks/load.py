@@ -0,0 +1,139 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+import httpx
+from benchmarks.stats import summarize
+
+SCENARIOS = ["login", "refresh", "me", "users_list", "tenants_list"]
+PASSWORD = "bench-password"
+
+
+async def seed(users: int) -> tuple[str, list[str]]:
+    """Create a throwaway tenant with one admin per virtual user, straight through the ORM."""
+    from app.core.security import hash_password
+    from app.db.session import AsyncSessionLocal
+    from app.models import Tenant, User
+
+    tenant = Tenant(tenant_id=uuid.uuid4(), name=f"bench-{uuid.uuid4().hex[:8]}")
+    hashed = hash_password(PASSWORD)
+    emails = [f"bench-{i}-{tenant.name}@example.com" for i in range(users)]
+    async with AsyncSessionLocal() as db:
+        db.add(tenant)
+        await db.flush()
+        db.add_all([
+            User(user_id=uuid.uuid4(), tenant_id=tenant.tenant_id, email=email, hashed_password=hashed, role="admin")
+            for email in emails
+        ])
+        await db.commit()
+    return tenant.name, emails
+
+
+async def login(client: httpx.AsyncClient, email: str) -> tuple[str, str]:
+    resp = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    resp.raise_for_status()
+    return resp.json()["access_token"], resp.cookies["refresh_token"]
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str):
+        self.client = client
+        self.email = email
+        self.access = None
+        self.refresh = None
+
+    async def setup(self):
+        self.access, self.refresh = await login(self.client, self.email)
+
+    async def call(self, scenario: str) -> httpx.Response:
+        if scenario == "login":
+            return await self.client.post("/auth/login", json={"email": self.email, "password": PASSWORD})
+        if scenario == "refresh":
+            resp = await self.client.post("/auth/refresh", json=self.refresh)
+            if resp.status_code == 200:
+                self.refresh = resp.json()["refresh_token"]
+            return resp
+        if scenario == "me":
+            return await self.client.get("/auth/me", params={"token": self.access})
+        if scenario == "users_list":
+            return await self.client.get("/users/", params={"token": self.access})
+        if scenario == "tenants_list":
+            return await self.client.get("/tenants/list")
+        raise ValueError(scenario)
+
+
+async def drive(vusers: list[VirtualUser], scenario: str, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(vu: VirtualUser):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                resp = await vu.call(scenario)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(vu) for vu in vusers))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        # a handful of virtual users logging in from one IP would hit the login
+        # limits within seconds and measure 429s instead of the login path
+        env={**os.environ, "RATE_LIMIT_ENABLED": "false"},
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    # /ready, not /ping: measuring before the warm-up is done would count cold pools
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+async def run_async(url: str, concurrency: int, duration: float, scenarios: list[str]) -> dict:
+    _, emails = await seed(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        await wait_ready(client)
+        vusers = [VirtualUser(client, email) for email in emails]
+        await asyncio.gather(*(vu.setup() for vu in vusers))
+
+        results = {}
+        for scenario in scenarios:
+            results[scenario] = await drive(vusers, scenario, duration)
+        return {"url": url, "concurrency": concurrency, "duration_sec": duration, "scenarios": results}
+
+
+def run(concurrency: int, duration: float, scenarios: list[str], url: str | None = None,
+        port: int = 8765, workers: int = 1) -> dict:
+    server = None
+    if url is None:
+        server = start_server(port, workers)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        return asyncio.run(run_async(url, concurrency, duration, scenarios))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
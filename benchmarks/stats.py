@@ -0,0 +1,21 @@
+import statistics
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Latencies in seconds -> throughput and percentile report in ms."""
+    count = len(latencies)
+    report = {
+        "requests": count,
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_per_sec": round(count / elapsed, 2) if elapsed else 0.0,
+    }
+    if count >= 2:
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        report.update({
+            "p50_ms": round(q[49] * 1000, 3),
+            "p95_ms": round(q[94] * 1000, 3),
+            "p99_ms": round(q[98] * 1000, 3),
+            "max_ms": round(max(latencies) * 1000, 3),
+        })
+    return report
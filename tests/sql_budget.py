@@ -0,0 +1,48 @@
+"""
+pytest plugin enforcing the routes' @sql_budget, loaded by tests/conftest.py.
+
+    pytest [--sql-budget-strict]
+
+Turns the SQL profiler on for the session. A test fails when a request it
+made ran more statements than its route's budget, or, with
+--sql-budget-strict, reached a route that declares none. The `sql_profile`
+fixture profiles code a test calls directly, e.g. a repository method.
+Only statements run through the app's instrumented engines are seen.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--sql-budget-strict", action="store_true",
+                     help="also fail on requests to routes without @sql_budget")
+
+
+def pytest_configure(config):
+    # imported here so conftest.py can set up the environment settings read
+    from app.core.sql_profiler import sql_profiler
+
+    sql_profiler.enabled = True
+    sql_profiler.strict = config.getoption("--sql-budget-strict")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Only requests made by the test body count, not those of its fixtures."""
+    from app.core.sql_profiler import sql_profiler
+
+    sql_profiler.violations.clear()
+    result = yield
+    violations = list(sql_profiler.violations)
+    sql_profiler.violations.clear()
+    if violations:
+        pytest.fail("SQL budget exceeded:\n" + "\n\n".join(violations), pytrace=False)
+    return result
+
+
+@pytest.fixture
+def sql_profile():
+    """RequestProfile collecting the statements run inside the test."""
+    from app.core.sql_profiler import sql_profiler
+
+    with sql_profiler.profile("test") as profile:
+        yield profile
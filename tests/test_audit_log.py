@@ -0,0 +1,59 @@
+import asyncio
+import time
+from app.repositories.audit_repo import AuditRepository
+from app.services.audit_log import LOGIN_FAILED, AuditLog
+
+
+def _audit_log(**kwargs) -> AuditLog:
+    options = dict(queue_size=10, batch_size=10, flush_interval=0.01, overflow="drop", drain_timeout=1.0)
+    return AuditLog(**{**options, **kwargs})
+
+
+def test_failed_write_does_not_stop_the_writer(monkeypatch):
+    written = []
+
+    async def insert_many(db, rows):
+        if not written:
+            written.append(None)
+            raise RuntimeError("not a database error")
+        written.extend(rows)
+
+    async def record_logins(db, logins):
+        pass
+
+    monkeypatch.setattr(AuditRepository, "insert_many", insert_many)
+    monkeypatch.setattr(AuditRepository, "record_logins", record_logins)
+
+    async def scenario():
+        audit_log = _audit_log()
+        audit_log.start()
+        task = audit_log._task
+        await audit_log.record(LOGIN_FAILED, reason="first")
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        await audit_log.record(LOGIN_FAILED, reason="second")
+        await audit_log.stop()
+        return task
+
+    task = asyncio.run(scenario())
+    assert task.exception() is None
+    assert [row["detail"] for row in written[1:]] == [{"reason": "second"}]
+
+
+def test_stop_with_a_full_queue_gives_up_after_drain_timeout(monkeypatch):
+    async def stuck(self, events):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(AuditLog, "write", stuck)
+
+    async def scenario():
+        audit_log = _audit_log(queue_size=1, drain_timeout=0.1)
+        audit_log.start()
+        await audit_log.record(LOGIN_FAILED)  # taken by the stuck writer
+        await asyncio.sleep(0.05)
+        await audit_log.record(LOGIN_FAILED)  # fills the queue
+        start = time.monotonic()
+        await audit_log.stop()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 1.0
@@ -0,0 +1,51 @@
+"""Every login is held to its own tenant's limits, whatever other tenants' overrides say."""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import text
+from app.core.rate_limit import rate_limiter
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "limits", {"login_ip": 0, "login_email": 2})
+    monkeypatch.setattr(rate_limiter, "tenant_overrides", {})
+    rate_limiter.backend.clear()
+    yield rate_limiter
+    rate_limiter.backend.clear()
+
+
+@pytest.fixture
+def tenant(client, engine):
+    """(tenant_id, email) of a fresh tenant with one user; removed afterwards."""
+    tenant_id = client.post("/tenants/register", json={"name": f"test-{uuid.uuid4()}"}).json()["tenant_id"]
+    email = f"{uuid.uuid4()}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret", "tenant_id": tenant_id})
+    yield tenant_id, email
+
+    async def cleanup():
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM users WHERE tenant_id = :t"), {"t": tenant_id})
+            await conn.execute(text("DELETE FROM tenants WHERE tenant_id = :t"), {"t": tenant_id})
+
+    asyncio.run(cleanup())
+
+
+def _statuses(client, email, tenant_id, attempts=4) -> list[int]:
+    body = {"email": email, "password": "wrong", "tenant_id": tenant_id}
+    return [client.post("/auth/login", json=body).status_code for _ in range(attempts)]
+
+
+@pytest.mark.parametrize("other_override", [50, 0], ids=["generous", "disabled"])
+@pytest.mark.parametrize("with_tenant_id", [True, False])
+def test_other_tenants_overrides_do_not_loosen_limits(client, limits, tenant, other_override, with_tenant_id):
+    tenant_id, email = tenant
+    limits.tenant_overrides = {str(uuid.uuid4()): {"login_email": other_override}}
+    assert _statuses(client, email, tenant_id if with_tenant_id else None) == [401, 401, 429, 429]
+
+
+def test_tenant_override_applies_with_tenant_id(client, limits, tenant):
+    tenant_id, email = tenant
+    limits.tenant_overrides = {tenant_id: {"login_email": 3}}
+    assert _statuses(client, email, tenant_id) == [401, 401, 401, 429]
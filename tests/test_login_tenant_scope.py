@@ -0,0 +1,42 @@
+"""Emails are unique per tenant, so login has to look the user up within its tenant."""
+import asyncio
+import uuid
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.security import hash_password
+from app.repositories.tenant_repo import TenantRepository
+from app.repositories.user_repo import UserRepository
+from app.services.auth_service import AuthService
+
+
+def test_login_is_scoped_to_the_tenant(engine):
+    email = f"{uuid.uuid4()}@example.com"
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def scenario():
+        async with sessionmaker() as db:
+            tenants = [await TenantRepository.create(db, f"test-{uuid.uuid4()}") for _ in range(2)]
+            users = [await UserRepository.create(db, email, hash_password(f"secret-{i}"), t.tenant_id)
+                     for i, t in enumerate(tenants)]
+            ids = [t.tenant_id for t in tenants]
+            try:
+                _, _, user = await AuthService.login(db, email, "secret-1", tenant_id=tenants[1].tenant_id)
+                assert user.user_id == users[1].user_id
+
+                # right password, other tenant
+                with pytest.raises(HTTPException) as exc:
+                    await AuthService.login(db, email, "secret-1", tenant_id=tenants[0].tenant_id)
+                assert exc.value.status_code == 401
+
+                with pytest.raises(HTTPException) as exc:
+                    await AuthService.login(db, email, "secret-1")
+                assert exc.value.status_code == 400
+            finally:
+                await db.rollback()
+                await db.execute(text("DELETE FROM users WHERE tenant_id = ANY(:ids)"), {"ids": ids})
+                await db.execute(text("DELETE FROM tenants WHERE tenant_id = ANY(:ids)"), {"ids": ids})
+                await db.commit()
+
+    asyncio.run(scenario())
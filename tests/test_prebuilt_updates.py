@@ -0,0 +1,24 @@
+"""
+The repositories' prebuilt UPDATEs only fail when executed: a parameter named
+like a column of the updated table is rejected at compile time.
+"""
+import asyncio
+import uuid
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.token_epochs import bump_epoch
+from app.repositories.token_repo import TokenRepository
+from app.repositories.user_repo import UserRepository
+
+
+def test_prebuilt_updates_execute(engine):
+    async def run():
+        async with async_sessionmaker(engine)() as db:  # matches nothing, rolled back on exit
+            assert await TokenRepository.rotate(db, "0" * 64) is None
+            assert await TokenRepository.revoke_for_user(db, uuid.uuid4()) == 0
+            assert await TokenRepository.revoke_for_user(db, uuid.uuid4(), uuid.uuid4()) == 0
+            assert await TokenRepository.revoke_for_tenant(db, uuid.uuid4()) == 0
+            assert await TokenRepository.revoke_family(db, uuid.uuid4()) == 0
+            await UserRepository.set_password_hash(db, uuid.uuid4(), "hash")
+            assert await bump_epoch(db, uuid.uuid4()) is None
+
+    asyncio.run(run())
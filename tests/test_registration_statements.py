@@ -0,0 +1,35 @@
+"""Registration is a single INSERT ... ON CONFLICT ... RETURNING, taken or not."""
+import asyncio
+import uuid
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.security import hash_password
+from app.repositories.tenant_repo import TenantRepository
+from app.repositories.user_repo import UserRepository
+
+
+def test_tenant_and_user_create_are_one_statement_each(engine, sql_statements):
+    name = f"test-{uuid.uuid4()}"
+    email = f"{uuid.uuid4()}@example.com"
+    hashed = hash_password("secret")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def register():
+        async with sessionmaker() as db:
+            tenant = await TenantRepository.create(db, name)
+            assert tenant is not None
+            assert len(sql_statements) == 1, sql_statements
+            assert await TenantRepository.create(db, name) is None
+            assert len(sql_statements) == 2, sql_statements
+
+            user = await UserRepository.create(db, email, hashed, tenant.tenant_id)
+            assert user is not None
+            assert len(sql_statements) == 3, sql_statements
+            assert await UserRepository.create(db, email, hashed, tenant.tenant_id) is None
+            assert len(sql_statements) == 4, sql_statements
+
+            await db.execute(text("DELETE FROM users WHERE tenant_id = :t"), {"t": tenant.tenant_id})
+            await db.execute(text("DELETE FROM tenants WHERE tenant_id = :t"), {"t": tenant.tenant_id})
+            await db.commit()
+
+    asyncio.run(register())
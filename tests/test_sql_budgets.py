@@ -0,0 +1,118 @@
+"""
+Requests made through `client` are held to their route's @sql_budget by the
+plugin in tests/sql_budget.py; these tests walk the routes and check the
+plugin itself. Budgets are worst cases: every principal lookup misses the
+cache, and the event bus publishes with NOTIFY (EVENT_BUS_BACKEND=postgres).
+"""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import text
+from app.core.principal_cache import principal_cache
+
+_PLUGIN_TESTS = """
+from app.core.sql_profiler import RequestProfile, Statement, sql_profiler
+
+def _finish(route, statements, budget):
+    sql_profiler.finish(RequestProfile(route, [Statement("primary", "SELECT 1", 0.0, False)] * statements, budget))
+
+def test_within_budget():
+    _finish("GET /within", 2, 2)
+
+def test_over_budget():
+    _finish("GET /over", 3, 2)
+
+def test_no_budget():
+    _finish("GET /unbudgeted", 1, None)
+"""
+
+
+def test_plugin_fails_tests_over_budget(pytester):
+    pytester.makepyfile(_PLUGIN_TESTS)
+    result = pytester.runpytest("-p", "tests.sql_budget")
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(["*GET /over ran 3 SQL statements, budget is 2*"])
+
+
+def test_plugin_strict_fails_routes_without_budget(pytester):
+    pytester.makepyfile(_PLUGIN_TESTS)
+    result = pytester.runpytest("-p", "tests.sql_budget", "--sql-budget-strict")
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(["*GET /unbudgeted has no @sql_budget*"])
+
+
+@pytest.fixture
+def tenant(client, engine):
+    """A fresh tenant with an admin, signed in; removed afterwards."""
+    async def execute(sql, **params):
+        async with engine.begin() as conn:
+            await conn.execute(text(sql), params)
+
+    tenant_id = client.post("/tenants/register", json={"name": f"test-{uuid.uuid4()}"}).json()["tenant_id"]
+    email = f"admin-{uuid.uuid4()}@example.com"
+    user_id = client.post("/auth/register", json={"email": email, "password": "secret", "tenant_id": tenant_id}).json()["user_id"]
+    asyncio.run(execute("UPDATE users SET role = 'admin' WHERE user_id = :user_id", user_id=user_id))
+    login = client.post("/auth/login", json={"email": email, "password": "secret", "tenant_id": tenant_id}).json()
+    yield {"tenant_id": tenant_id, "user_id": user_id, "email": email, "auth": {"token": login["access_token"]}}
+
+    asyncio.run(execute("DELETE FROM users WHERE tenant_id = :t", t=tenant_id))
+    asyncio.run(execute("DELETE FROM tenants WHERE tenant_id = :t", t=tenant_id))
+
+
+@pytest.fixture
+def cold_principals(monkeypatch):
+    monkeypatch.setattr(principal_cache, "get", lambda user_id: None)
+
+
+def _register(client, tenant) -> str:
+    return client.post("/auth/register", json={"email": f"{uuid.uuid4()}@example.com", "password": "secret",
+                                               "tenant_id": tenant["tenant_id"]}).json()["user_id"]
+
+
+def test_auth_routes_within_budget(client, tenant, cold_principals):
+    response = client.post("/auth/login", json={"email": tenant["email"], "password": "secret",
+                                                "tenant_id": tenant["tenant_id"]})
+    login = {**response.json(), "refresh_token": response.cookies["refresh_token"]}
+    assert client.get("/auth/me", params=tenant["auth"]).status_code == 200
+    assert client.get("/auth/admin/data", params=tenant["auth"]).status_code == 200
+    assert client.post("/auth/introspect", json={"tokens": [login["access_token"]]}).json()["results"][0]["active"]
+
+    refreshed = client.post("/auth/refresh", json=login["refresh_token"]).json()
+    assert client.post("/auth/logout", json=refreshed["refresh_token"]).status_code == 200
+    # replaying a rotated token revokes its family
+    assert client.post("/auth/refresh", json=login["refresh_token"]).status_code == 401
+
+
+def test_user_and_tenant_routes_within_budget(client, tenant, cold_principals):
+    auth = tenant["auth"]
+    other = _register(client, tenant)
+
+    assert len(client.get("/users/", params=auth).json()["items"]) == 2
+    assert client.get("/users/export", params=auth).status_code == 200
+    assert client.get(f"/users/{other}", params=auth).status_code == 200
+    assert client.patch(f"/users/{other}", json={"role": "manager"}, params=auth).json()["role"] == "manager"
+    assert client.post(f"/users/{other}/reset-password", json="changed", params=auth).status_code == 200
+
+    assert client.get("/tenants/list", params={"limit": 1}).status_code == 200
+    for mode in ("prefix", "substring", "fuzzy"):
+        assert client.get("/tenants/search", params={"q": "test", "mode": mode}).status_code == 200
+    for path in ("/ping", "/ready", "/metrics", "/.well-known/jwks.json"):
+        assert client.get(path).status_code == 200
+
+
+def test_delete_user_within_budget(client, tenant, engine, cold_principals):
+    email = f"{uuid.uuid4()}@example.com"
+    other = client.post("/auth/register", json={"email": email, "password": "secret",
+                                                "tenant_id": tenant["tenant_id"]}).json()["user_id"]
+    client.post("/auth/login", json={"email": email, "password": "secret", "tenant_id": tenant["tenant_id"]})
+
+    async def execute(sql):
+        async with engine.begin() as conn:
+            result = await conn.execute(text(sql), {"u": other, "t": tenant["tenant_id"]})
+            return result.scalar() if result.returns_rows else None
+
+    asyncio.run(execute("INSERT INTO security_tokens (id, user_id, tenant_id, token_hash, token_type, expires_at) "
+                       "VALUES (gen_random_uuid(), :u, :t, 'hash', 'verify', now() + interval '1 day')"))
+    assert client.delete(f"/users/{other}", params=tenant["auth"]).status_code == 200
+    assert asyncio.run(execute("SELECT count(*) FROM refresh_tokens WHERE user_id = :u")) == 0
+    assert asyncio.run(execute("SELECT count(*) FROM security_tokens WHERE user_id = :u")) == 0
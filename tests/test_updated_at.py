@@ -0,0 +1,28 @@
+"""updated_at drives incremental exports; token revocation and re-hashing must leave it alone."""
+import asyncio
+import uuid
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.token_epochs import bump_epoch
+from app.repositories.tenant_repo import TenantRepository
+from app.repositories.user_repo import UserRepository
+
+
+def test_epoch_bump_and_rehash_keep_updated_at(engine):
+    async def run():
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            tenant = await TenantRepository.create(db, f"test-{uuid.uuid4()}")
+            user = await UserRepository.create(db, f"{uuid.uuid4()}@example.com", "hash", tenant.tenant_id)
+            try:
+                await bump_epoch(db, user.user_id)
+                await UserRepository.set_password_hash(db, user.user_id, "rehash")
+                await db.commit()
+                updated_at = (await db.execute(text("SELECT updated_at FROM users WHERE user_id = :u"),
+                                               {"u": user.user_id})).scalar_one()
+                assert updated_at == user.updated_at
+            finally:
+                await db.execute(text("DELETE FROM users WHERE user_id = :u"), {"u": user.user_id})
+                await db.execute(text("DELETE FROM tenants WHERE tenant_id = :t"), {"t": tenant.tenant_id})
+                await db.commit()
+
+    asyncio.run(run())
@@ -0,0 +1,16 @@
+import asyncio
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.services.warmup import Warmup
+
+
+def test_warmup_retries_until_it_succeeds(monkeypatch):
+    warmup = Warmup(connections=1, retry_interval=0)
+    failures = [PoolTimeoutError("pool exhausted"), RuntimeError("anything else")]
+
+    async def run_once():
+        if failures:
+            raise failures.pop(0)
+
+    monkeypatch.setattr(warmup, "run_once", run_once)
+    asyncio.run(warmup.run())
+    assert warmup.ready and not failures